@@ -0,0 +1,41 @@
+import asyncio
+
+from sqlalchemy import select
+
+from config import settings
+from src.models import Composition
+from src.database import session_holder
+from src.routes.content.composition.service import refresh_cards
+
+BATCH_SIZE = 500
+
+
+async def main():
+    """Render cards of all compositions, e.g. after card format is changed"""
+    session_holder.init(settings.postgresql.url)
+
+    last_id = 0
+    async with session_holder.session() as session:
+        while True:
+            ids = (
+                await session.scalars(
+                    select(Composition.id)
+                    .filter(Composition.id > last_id)
+                    .order_by(Composition.id)
+                    .limit(BATCH_SIZE)
+                )
+            ).all()
+            if not ids:
+                break
+
+            await refresh_cards(session, ids)
+            session.expunge_all()
+            last_id = ids[-1]
+
+            print(f"Rendered cards of {len(ids)} compositions, last id {last_id}")
+
+    await session_holder.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
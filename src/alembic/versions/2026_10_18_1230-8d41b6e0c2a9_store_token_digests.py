@@ -0,0 +1,46 @@
+"""store token digests
+
+Revision ID: 8d41b6e0c2a9
+Revises: 3f9c2a7d1e54
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8d41b6e0c2a9"
+down_revision: Union[str, None] = "3f9c2a7d1e54"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("service_tokens", sa.Column("digest", sa.LargeBinary(length=32), nullable=True))
+
+    # Bodies were never unique on database level - keep only the newest token of duplicates
+    op.execute(
+        "DELETE FROM service_tokens a USING service_tokens b WHERE a.body = b.body AND a.id < b.id"
+    )
+    op.execute("UPDATE service_tokens SET digest = sha256(convert_to(body, 'UTF8'))")
+
+    op.alter_column("service_tokens", "digest", nullable=False)
+    op.create_index(op.f("ix_service_tokens_digest"), "service_tokens", ["digest"], unique=True)
+    op.drop_index("ix_service_tokens_body", table_name="service_tokens")
+    op.drop_column("service_tokens", "body")
+
+
+def downgrade() -> None:
+    """
+    Plain bodies can't be restored from digests, so all tokens are dropped
+    """
+    op.execute("DELETE FROM service_tokens")
+
+    op.add_column("service_tokens", sa.Column("body", sa.VARCHAR(), nullable=False))
+    op.create_index("ix_service_tokens_body", "service_tokens", ["body"], unique=False)
+    op.drop_index(op.f("ix_service_tokens_digest"), table_name="service_tokens")
+    op.drop_column("service_tokens", "digest")
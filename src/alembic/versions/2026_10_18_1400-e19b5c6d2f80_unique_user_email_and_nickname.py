@@ -0,0 +1,36 @@
+"""unique user email and nickname
+
+Revision ID: e19b5c6d2f80
+Revises: 5a0d8e3b7f21
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e19b5c6d2f80"
+down_revision: Union[str, None] = "5a0d8e3b7f21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Fails if there are users with duplicated emails or nicknames,
+    they must be resolved manually before upgrade
+    """
+    op.drop_index("ix_service_users_email", table_name="service_users")
+    op.drop_index("ix_service_users_nickname", table_name="service_users")
+    op.create_index(op.f("ix_service_users_email"), "service_users", ["email"], unique=True)
+    op.create_index(op.f("ix_service_users_nickname"), "service_users", ["nickname"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_service_users_nickname"), table_name="service_users")
+    op.drop_index(op.f("ix_service_users_email"), table_name="service_users")
+    op.create_index("ix_service_users_nickname", "service_users", ["nickname"], unique=False)
+    op.create_index("ix_service_users_email", "service_users", ["email"], unique=False)
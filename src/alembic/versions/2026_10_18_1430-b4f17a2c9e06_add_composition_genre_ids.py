@@ -0,0 +1,61 @@
+"""add composition genre ids
+
+Revision ID: b4f17a2c9e06
+Revises: e19b5c6d2f80
+Create Date: 2026-10-18 14:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b4f17a2c9e06"
+down_revision: Union[str, None] = "e19b5c6d2f80"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "service_compositions",
+        sa.Column(
+            "genre_ids", postgresql.ARRAY(sa.BigInteger()), server_default="{}", nullable=False
+        ),
+    )
+    op.execute(
+        """
+        UPDATE service_compositions
+        SET genre_ids = genres.ids
+        FROM (
+            SELECT second_id AS composition_id, array_agg(first_id) AS ids
+            FROM association_composition_genres
+            GROUP BY second_id
+        ) AS genres
+        WHERE genres.composition_id = service_compositions.id
+        """
+    )
+    op.create_index(
+        "ix_service_compositions_genre_ids",
+        "service_compositions",
+        ["genre_ids"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_service_compositions_tags",
+        "service_compositions",
+        ["tags"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_service_compositions_tags", table_name="service_compositions")
+    op.drop_index("ix_service_compositions_genre_ids", table_name="service_compositions")
+    op.drop_column("service_compositions", "genre_ids")
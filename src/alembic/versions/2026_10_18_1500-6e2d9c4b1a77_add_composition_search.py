@@ -0,0 +1,90 @@
+"""add composition search
+
+Revision ID: 6e2d9c4b1a77
+Revises: b4f17a2c9e06
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "6e2d9c4b1a77"
+down_revision: Union[str, None] = "b4f17a2c9e06"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+search_vector_expression = (
+    "setweight(to_tsvector('simple', "
+    "coalesce(title_original, '') || ' ' || coalesce(title_en, '') || ' ' || coalesce(title_uk, '')"
+    "), 'A') || "
+    "setweight(to_tsvector('simple', "
+    "coalesce(synopsis_en, '') || ' ' || coalesce(synopsis_uk, '')"
+    "), 'B')"
+)
+
+title_columns = ("title_original", "title_en", "title_uk")
+
+
+def upgrade() -> None:
+    op.drop_index(op.f("ix_service_compositions_synopsis_uk"), table_name="service_compositions")
+    op.drop_index(op.f("ix_service_compositions_synopsis_en"), table_name="service_compositions")
+
+    op.add_column(
+        "service_compositions",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(search_vector_expression, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_service_compositions_search_vector",
+        "service_compositions",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+    # Typo tolerant title search is enabled only where pg_trgm can be installed
+    trigram_indexes = "\n".join(
+        f"CREATE INDEX ix_service_compositions_{column}_trgm "
+        f"ON service_compositions USING gin ({column} gin_trgm_ops);"
+        for column in title_columns
+    )
+    op.execute(f"""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+                CREATE EXTENSION IF NOT EXISTS pg_trgm;
+                {trigram_indexes}
+            END IF;
+        END
+        $$;
+        """)
+
+
+def downgrade() -> None:
+    for column in title_columns:
+        op.execute(f"DROP INDEX IF EXISTS ix_service_compositions_{column}_trgm")
+
+    op.drop_index("ix_service_compositions_search_vector", table_name="service_compositions")
+    op.drop_column("service_compositions", "search_vector")
+
+    op.create_index(
+        op.f("ix_service_compositions_synopsis_en"),
+        "service_compositions",
+        ["synopsis_en"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_service_compositions_synopsis_uk"),
+        "service_compositions",
+        ["synopsis_uk"],
+        unique=False,
+    )
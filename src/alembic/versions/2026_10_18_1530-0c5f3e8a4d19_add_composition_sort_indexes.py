@@ -0,0 +1,48 @@
+"""add composition sort indexes
+
+Revision ID: 0c5f3e8a4d19
+Revises: 6e2d9c4b1a77
+Create Date: 2026-10-18 15:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0c5f3e8a4d19"
+down_revision: Union[str, None] = "6e2d9c4b1a77"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+sort_keys = {
+    "score": sa.column("score"),
+    "scored_by": sa.column("scored_by"),
+    "variants": sa.column("variants"),
+    "year": sa.text("coalesce(year, 0)"),
+    "created_at": sa.column("created_at"),
+    "title": sa.text("coalesce(title_uk, title_en, title_original)"),
+}
+
+
+def upgrade() -> None:
+    # Column was created as "variant", while model always called it "variants"
+    op.alter_column("service_compositions", "variant", new_column_name="variants")
+
+    for name, key in sort_keys.items():
+        op.create_index(
+            f"ix_service_compositions_sort_{name}",
+            "service_compositions",
+            [key, "id"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    for name in reversed(sort_keys):
+        op.drop_index(f"ix_service_compositions_sort_{name}", table_name="service_compositions")
+
+    op.alter_column("service_compositions", "variants", new_column_name="variant")
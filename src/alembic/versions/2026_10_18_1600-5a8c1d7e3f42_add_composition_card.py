@@ -0,0 +1,30 @@
+"""add composition card
+
+Revision ID: 5a8c1d7e3f42
+Revises: 0c5f3e8a4d19
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "5a8c1d7e3f42"
+down_revision: Union[str, None] = "0c5f3e8a4d19"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "service_compositions",
+        sa.Column("card", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("service_compositions", "card")
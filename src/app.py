@@ -11,14 +11,28 @@ from ratelimit.store.redis import RedisStore
 from ratelimit.ranking.redis import RedisRanking
 
 import config
-from src import scheme
+from src import scheme, constants
 from src.database import session_holder
+from src.token_cache import token_cache
+from src.result_cache import result_cache
+from src.single_flight import single_flight
+from src.response_cache import ResponseCacheMiddleware
+from src.presence import presence
+from src.suggest import suggest_index
+from src.catalog_snapshot import catalog_snapshot
+from src.token_usage import token_usage
+from src.signed_tokens import token_generations
+from src.password_hasher import password_hasher
+from src.dependencies import master_lock, invalid_cursor
 from src.routes import router as main_router
 from src.permissions import permission_registry
 from src.ratelimit import RatelimitUser, authentication_func, memory_ranking, memory_store
 
 from src.util import (
+    NotModified,
     format_error,
+    InvalidCursor,
+    metrics_snapshot,
     setup_route_errors,
     render_route_permissions,
 )
@@ -28,6 +42,14 @@ def error_handler(_, exc: scheme.APIError):
     return exc.response
 
 
+def invalid_cursor_handler(_, __: InvalidCursor):
+    return invalid_cursor.response
+
+
+def not_modified_handler(_, exc: NotModified):
+    return exc.response
+
+
 endpoint_not_found = scheme.define_error("endpoint", "not-found", "Path {path} not found", 404)
 
 
@@ -51,12 +73,37 @@ def lifespan(test_mode: bool = True) -> Callable[[FastAPI], AsyncContextManager[
         if test_mode:
             ranking = memory_ranking()
             store = memory_store()
+            token_cache.setup(None)
+            result_cache.setup(None)
+            single_flight.setup(None)
+            token_generations.setup(None)
+            token_usage.setup(None)
+            presence.setup(None)
+            suggest_index.setup(None)
+            catalog_snapshot.setup(None)
             dramatiq.set_broker(dramatiq.Broker())
         else:
             session_holder.init(url=config.settings.postgresql.url)
             redis = Redis.from_url(url=config.settings.redis.url)
             ranking = RedisRanking(redis, RatelimitUser)
             store = RedisStore(redis)
+            token_cache.setup(redis)
+            result_cache.setup(redis)
+            result_cache.start()
+            single_flight.setup(redis)
+            token_generations.setup(redis)
+            token_usage.start()
+            presence.setup(redis, constants.PRESENCE_SYNC_INTERVAL)
+            presence.start()
+
+            async with session_holder.session() as session:
+                await suggest_index.refresh(session)
+                await catalog_snapshot.refresh(session)
+
+            suggest_index.setup(constants.SUGGEST_REFRESH_INTERVAL)
+            suggest_index.start()
+            catalog_snapshot.setup(constants.CATALOG_SNAPSHOT_REFRESH_INTERVAL)
+            catalog_snapshot.start()
 
             setup_route_errors(app)
             render_route_permissions(app)
@@ -71,6 +118,12 @@ def lifespan(test_mode: bool = True) -> Callable[[FastAPI], AsyncContextManager[
         yield
 
         if not test_mode:
+            await token_usage.stop()
+            await presence.stop()
+            await result_cache.stop()
+            await suggest_index.stop()
+            await catalog_snapshot.stop()
+            password_hasher.shutdown()
             await session_holder.close()
 
     return asynccontextmanager(lifespan)
@@ -99,7 +152,11 @@ def make_app(test_mode: bool = False) -> fastapi.FastAPI:
     app.include_router(home_router)
     app.include_router(main_router)
 
+    app.add_middleware(ResponseCacheMiddleware)
+
     app.exception_handler(scheme.APIError)(error_handler)
+    app.exception_handler(InvalidCursor)(invalid_cursor_handler)
+    app.exception_handler(NotModified)(not_modified_handler)
     app.exception_handler(fastapi.exceptions.RequestValidationError)(validation_error_handler)
 
     return app
@@ -127,3 +184,8 @@ async def _errors() -> dict[str, dict[str, tuple[int, str]]]:
 @home_router.get("/permissions")
 async def _permissions() -> list[str]:
     return permission_registry
+
+
+@home_router.get("/metrics", dependencies=[fastapi.Depends(master_lock)])
+async def _metrics() -> dict[str, dict[str, float]]:
+    return metrics_snapshot()
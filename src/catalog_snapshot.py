@@ -0,0 +1,251 @@
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from src import constants
+from src.util import metric
+from src.models import Composition, Genre
+from src.database import session_holder
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Bits in one word of genres bitmap
+WORD = 64
+
+
+class CatalogSnapshot:
+    """
+    Columnar in-memory snapshot of compositions, used to filter composition list without
+    database. Optional: requires numpy and ``catalog.snapshot`` setting.
+
+    Numeric fields are float arrays (NULL is NaN, so range filters exclude it like SQL does),
+    style is categorical codes and genres are bitmap matrix - a row of 64-bit words per
+    composition. Filters evaluate as vectorized boolean masks, which give the total and ids of
+    the page. Rows are kept in id order, as composition list is.
+
+    Refresh follows modification time of compositions: new ones are added, modified ones are
+    overwritten in place. Each refresh re-reads compositions modified within ``overlap`` before
+    the newest one in snapshot, as transactions of other workers may commit late
+    """
+
+    def __init__(self, overlap: float):
+        self.overlap = timedelta(seconds=overlap)
+        self.interval: float | None = None
+        self._task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+        self.clear()
+
+    @property
+    def enabled(self) -> bool:
+        return np is not None and settings.get("catalog.snapshot", False)
+
+    def setup(self, interval: float | None = None) -> None:
+        self.interval = interval
+
+    def clear(self) -> None:
+        # Modification time of the newest composition in snapshot
+        self.last_modified: datetime | None = None
+        # composition id -> row
+        self.positions: dict[int, int] = {}
+
+        # style -> code, genre id -> bit, genre slug -> genre ids
+        self.styles: dict[str, int] = {}
+        self.genre_bits: dict[int, int] = {}
+        self.genre_slugs: dict[str, list[int]] = {}
+
+        if np is None:
+            return
+
+        self.ids = np.empty(0, dtype=np.int64)
+        self.year = np.empty(0, dtype=np.float32)
+        self.volumes = np.empty(0, dtype=np.float32)
+        self.chapters = np.empty(0, dtype=np.float32)
+        self.style = np.empty(0, dtype=np.int16)
+        self.nsfw = np.empty(0, dtype=bool)
+        self.genres = np.zeros((0, 0), dtype=np.uint64)
+
+    def start(self) -> None:
+        if self.enabled and self.interval is not None and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+
+            try:
+                async with session_holder.session() as session:
+                    await self.refresh(session)
+            except Exception:  # noqa
+                logger.exception("Catalog snapshot refresh failed")
+
+    def supports(self, body) -> bool:
+        """Whether composition list with these filters can be served by snapshot"""
+        return (
+            self.enabled
+            and body.tags is None
+            and body.tags_exclude is None
+            and body.sort is None
+            and body.order == "asc"
+        )
+
+    async def refresh(self, session: AsyncSession) -> None:
+        """Add compositions published and overwrite ones modified since last refresh"""
+        if not self.enabled:
+            return
+
+        async with self._lock:
+            start = time.perf_counter()
+
+            self.genre_slugs = {}
+            for id_, slug in await session.execute(select(Genre.id, Genre.slug)):
+                self.genre_slugs.setdefault(slug, []).append(id_)
+
+            query = select(
+                Composition.id,
+                Composition.created_at,
+                Composition.updated_at,
+                Composition.year,
+                Composition.volumes,
+                Composition.chapters,
+                Composition.style,
+                Composition.nsfw,
+                Composition.genre_ids,
+            )
+
+            if self.last_modified is not None:
+                since = self.last_modified - self.overlap
+                query = query.filter(
+                    or_(Composition.created_at >= since, Composition.updated_at >= since)
+                )
+
+            rows = await session.stream(
+                query.order_by(Composition.id).execution_options(yield_per=10_000)
+            )
+
+            async for partition in rows.partitions():
+                self._upsert(partition)
+
+            metric("catalog_snapshot.size").observe(len(self.ids))
+            metric("catalog_snapshot.refresh.latency").observe(time.perf_counter() - start)
+
+    def _upsert(self, rows) -> None:
+        def numeric(values):
+            return np.array([np.nan if value is None else value for value in values], np.float32)
+
+        for row in rows:
+            modified = row.updated_at or row.created_at
+            self.last_modified = max(modified, self.last_modified or modified)
+
+        style = [self.styles.setdefault(row.style, len(self.styles)) for row in rows]
+        bits = [
+            [self.genre_bits.setdefault(id_, len(self.genre_bits)) for id_ in row.genre_ids]
+            for row in rows
+        ]
+
+        words = max(self.genres.shape[1], -(-len(self.genre_bits) // WORD))
+        if words > self.genres.shape[1]:
+            self.genres = np.pad(self.genres, ((0, 0), (0, words - self.genres.shape[1])))
+
+        genres = np.zeros((len(rows), words), dtype=np.uint64)
+        for index, row_bits in enumerate(bits):
+            for bit in row_bits:
+                genres[index, bit // WORD] |= np.uint64(1 << (bit % WORD))
+
+        columns = {
+            "ids": np.array([row.id for row in rows], np.int64),
+            "year": numeric(row.year for row in rows),
+            "volumes": numeric(row.volumes for row in rows),
+            "chapters": numeric(row.chapters for row in rows),
+            "style": np.array(style, np.int16),
+            "nsfw": np.array([row.nsfw for row in rows], bool),
+            "genres": genres,
+        }
+
+        # Modified compositions are overwritten in place, new ones are appended
+        existing = np.array([row.id in self.positions for row in rows], bool)
+        positions = [self.positions[row.id] for row in rows if row.id in self.positions]
+
+        for name, values in columns.items():
+            column = getattr(self, name)
+            column[positions] = values[existing]
+            setattr(self, name, np.concatenate((column, values[~existing])))
+
+        added = columns["ids"][~existing]
+        if not len(added):
+            return
+
+        if len(added) < len(self.ids) and added.min() < self.ids[: -len(added)].max():
+            # Composition committed late by other worker, restore id order
+            order = np.argsort(self.ids, kind="stable")
+            for name in columns:
+                setattr(self, name, getattr(self, name)[order])
+
+            self.positions = {id_: index for index, id_ in enumerate(self.ids.tolist())}
+        else:
+            start = len(self.ids) - len(added)
+            self.positions.update((id_, start + index) for index, id_ in enumerate(added.tolist()))
+
+    def _genres_mask(self, slugs: list[str]):
+        """Bitmap of genres with given slugs (genre slugs are not unique)"""
+        mask = np.zeros(self.genres.shape[1], dtype=np.uint64)
+
+        for slug in slugs:
+            for id_ in self.genre_slugs.get(slug, ()):
+                bit = self.genre_bits.get(id_)
+                if bit is not None:
+                    mask[bit // WORD] |= np.uint64(1 << (bit % WORD))
+
+        return mask
+
+    def filter(self, body, offset: int, limit: int) -> tuple[list[int], int]:
+        """Ids of compositions on the page and total amount of compositions matching filters"""
+        start = time.perf_counter()
+
+        mask = np.ones(len(self.ids), dtype=bool)
+
+        # Composition must have any of genres with each slug
+        for slug in set(body.genres or ()):
+            mask &= (self.genres & self._genres_mask([slug])).any(axis=1)
+
+        if body.genres_exclude is not None:
+            excluded = self._genres_mask(body.genres_exclude)
+            mask &= ~(self.genres & excluded).any(axis=1)
+
+        if body.nsfw is not None:
+            mask &= self.nsfw == body.nsfw
+
+        for column, bounds in (
+            (self.year, body.years),
+            (self.volumes, body.volumes),
+            (self.chapters, body.chapters),
+        ):
+            if bounds is not None:
+                mask &= (column >= bounds[0]) & (column <= bounds[1])
+
+        if body.styles is not None:
+            codes = [self.styles[style] for style in body.styles if style in self.styles]
+            mask &= np.isin(self.style, codes)
+
+        matched = np.flatnonzero(mask)
+
+        metric("catalog_snapshot.filter.latency").observe(time.perf_counter() - start)
+
+        return self.ids[matched[offset : offset + limit]].tolist(), len(matched)
+
+
+catalog_snapshot = CatalogSnapshot(constants.CATALOG_SNAPSHOT_REFRESH_OVERLAP)
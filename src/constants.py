@@ -10,7 +10,33 @@ GIGABYTE = 1024 * MEGABYTE
 # Service constants
 TOKEN_TTL = 6 * HOUR
 TOKEN_PROLONG_INTERVAL = 5 * HOUR + 55 * MINUTE
+# Resolved tokens cache. Local tier lives in worker's memory, shared tier - in redis
+TOKEN_CACHE_SIZE = 10_000
+TOKEN_CACHE_LOCAL_TTL = 15 * SECOND
+TOKEN_CACHE_TTL = 5 * MINUTE
+# Results cached by require_use_cache. Memory backend keeps at most RESULT_CACHE_SIZE entries,
+# redis backend compresses payloads larger than RESULT_CACHE_COMPRESS_THRESHOLD.
+# With redis, workers keep local copies of entries for RESULT_CACHE_LOCAL_TTL
+RESULT_CACHE_SIZE = 10_000
+RESULT_CACHE_TTL = 10 * MINUTE
+RESULT_CACHE_LOCAL_TTL = 15 * SECOND
+RESULT_CACHE_COMPRESS_THRESHOLD = 1 * KILOBYTE
+# GET responses of anonymous clients, served by ResponseCacheMiddleware. Purged on writes,
+# TTL bounds staleness of embedded data that isn't tracked (e.g. online status of authors)
+RESPONSE_CACHE_TTL = 1 * MINUTE
+# Identical concurrent loads are coalesced. Across workers the first one takes a lock,
+# others poll for its result up to SINGLE_FLIGHT_WAIT_TIMEOUT, then load it themselves
+SINGLE_FLIGHT_LOCK_TTL = 10 * SECOND
+SINGLE_FLIGHT_WAIT_TIMEOUT = 5 * SECOND
+SINGLE_FLIGHT_POLL_INTERVAL = 0.05 * SECOND
+# Token usage (used_at, expire_at) is written to database in batches
+TOKEN_USAGE_FLUSH_INTERVAL = 5 * SECOND
+# Expired tokens are deleted in batches until there are none left or time budget is exhausted
+TOKEN_SWEEP_BATCH_SIZE = 5_000
+TOKEN_SWEEP_TIME_BUDGET = 30 * SECOND
 DEFAULT_PAGE_SIZE = 15
+# With "estimate" count strategy, totals estimated by planner below this are counted exactly
+COUNT_ESTIMATE_THRESHOLD = 10_000
 
 PAGE_MAX_SIZE = 20 * MEGABYTE
 PAGE_ALLOWED_MIMES = ("image/png", "image/jpeg", "image/webp")
@@ -26,7 +52,32 @@ AVATAR_MAX_WIDTH = 1024
 AVATAR_MAX_HEIGHT = 1024
 
 USER_ONLINE_TTL = 5 * MINUTE
+# Presence is pushed to redis and refreshed from it with this interval
+PRESENCE_SYNC_INTERVAL = 5 * SECOND
 USER_NICKNAME_MIN = 5  # Characters
+# Random nickname candidates checked at once when nickname of oauth user is occupied
+NICKNAME_CANDIDATES = 4
+USER_PERMISSIONS_CACHE_SIZE = 10_000
+
+
+# Composition title suggestions. Keys are cut to this length, index stops growing at max entries
+SUGGEST_KEY_LENGTH = 32  # Characters
+SUGGEST_MAX_ENTRIES = 2_000_000
+SUGGEST_REFRESH_INTERVAL = 1 * MINUTE
+# Refresh re-reads compositions created this long before the newest indexed one,
+# so ones committed late by other workers are not missed
+SUGGEST_REFRESH_OVERLAP = 5 * MINUTE
+SUGGEST_LIMIT = 10
+SUGGEST_LIMIT_MAX = 50
+# Compositions published by other workers get into catalog snapshot with this interval
+CATALOG_SNAPSHOT_REFRESH_INTERVAL = 1 * MINUTE
+# Refresh re-reads compositions modified this long before the newest one in snapshot,
+# so ones committed late by other workers are not missed
+CATALOG_SNAPSHOT_REFRESH_OVERLAP = 5 * MINUTE
+
+
+# Compositions requested at once by batch endpoint
+COMPOSITION_BATCH_SIZE = 300
 
 
 # Composition styles
@@ -1,3 +1,5 @@
+import json
+import functools
 import contextlib
 from typing import AsyncIterator, AsyncGenerator
 
@@ -18,7 +20,12 @@ class SessionHolder:
 
     def init(self, url: str):
         self._url = url
-        self._engine = create_async_engine(url, echo=False)
+        self._engine = create_async_engine(
+            url,
+            echo=False,
+            # Non-ASCII text (e.g. ukrainian titles in composition cards) is sent as is, not escaped
+            json_serializer=functools.partial(json.dumps, ensure_ascii=False),
+        )
         self._session_maker = async_sessionmaker(
             autocommit=False,
             expire_on_commit=False,
@@ -1,23 +1,34 @@
-import warnings
+import inspect
 from functools import lru_cache
+from typing import Literal
 
 import puremagic
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import Header, Query, Depends, BackgroundTasks, params, Request, UploadFile, FastAPI
+from fastapi import Header, Query, Depends, BackgroundTasks, params, Request, UploadFile
 
 from config import settings
-from .util import cache_key_hash
+from .util import cache_key_hash, TokenClaims
 from . import service, scheme, util
-from src.database import session_holder, acquire_session
+from src.database import acquire_session
+from src.presence import presence
+from src.result_cache import result_cache, MISSING
+from src.single_flight import single_flight
+from src.token_usage import token_usage
+from src.permissions import permission_bitset
+from src.signed_tokens import signed_tokens_enabled, verify_token, token_generations
 from .models import Token, CompositionVariant, Volume, Chapter
 
 define_error = scheme.define_error_category("token")
 token_required = define_error("required", "Token required", 401)
 token_expired = define_error("expired", "Token expired", 401)
+token_revoked = define_error("revoked", "Token revoked", 401)
 master_required = define_error("master-required", "Master token required", 401)
 permission_denied = scheme.define_error(
     "permissions", "denied", "Permission denied: required permissions: {permissions}", 403
 )
+invalid_cursor = scheme.define_error(
+    "pagination", "invalid-cursor", "Invalid pagination cursor", 400
+)
 _variant_not_found = scheme.define_error(
     "content/composition/variant", "not-found", "Composition variant not found", 404
 )
@@ -39,23 +50,23 @@ def client_details(request: Request) -> scheme.ClientInfo:
         return scheme.ClientInfo(request.headers["x-real-ip"], agent)
 
 
-async def _use_token(token: str):
-    """Update token's ``used_at``, ``expire_at`` and owner's ``next_offline`` columns"""
-    async with session_holder.session() as session:
-        token = await service.get_token(session, token)
+async def _verify_signed_token(session: AsyncSession, body: str) -> TokenClaims | None:
+    """Check signature, expiration and generation of signed token without touching database"""
+    claims = verify_token(body)
+    if claims is None:
+        return None
+
+    if claims.expired():
+        raise token_expired
 
-        # Token was deleted in endpoint
-        if token is None:
-            return
+    if claims.generation != await token_generations.get(session, claims.owner_id):
+        raise token_revoked
 
-        token.use()
-        token.prolong()
-        token.owner.prolong_online()
-        session.add_all([token, token.owner])
-        await session.commit()
+    return claims
 
 
 @token_expired.mark
+@token_revoked.mark
 async def optional_token(
     background: BackgroundTasks,
     token_body: str | None = Header(
@@ -67,7 +78,15 @@ async def optional_token(
     session: AsyncSession = Depends(acquire_session),
 ) -> Token | None:
     """Prevent access to endpoint for users that provide expired token"""
-    token = await service.get_token(session, token_body)
+    claims = None
+    if token_body is not None and signed_tokens_enabled():
+        claims = await _verify_signed_token(session, token_body)
+        if claims is None:
+            token_body = None
+
+    # Claims only authenticate the token. Owner (profile, role, own permissions) and token
+    # (usage, info) are served from token cache, database is queried only on cache miss
+    token = await service.get_cached_token(session, token_body)
 
     if token is not None and token.expired():
         raise token_expired
@@ -77,7 +96,9 @@ async def optional_token(
     finally:
         # Prolong token, user online status and mark token as used only if it is a real token
         if isinstance(token, Token):
-            background.add_task(_use_token, token_body)
+            presence.touch(token.owner_id)
+            # Signed tokens carry their expiration time and can't be prolonged
+            background.add_task(token_usage.record, token, prolong=claims is None)
 
 
 @token_required.mark
@@ -103,17 +124,23 @@ def master_lock(master_granted: bool = Depends(master_grant)):
         raise master_required
 
 
-def check_permissions(master_granted: bool, token: Token | None, *permissions: str) -> bool:
+def check_permissions(
+    master_granted: bool, token: Token | None, *permissions: str, required_mask: int | None = None
+) -> bool:
     if master_granted:
         return True
 
     if not isinstance(token, Token):
         return False
 
-    if not util.check_permissions(permissions, token.owner.permissions):
-        return False
+    if required_mask is None:
+        required_mask = permission_bitset.required_mask(permissions)
+
+    # Required permissions are not concrete - fallback to matching one by one
+    if required_mask is None:
+        return util.check_permissions(permissions, token.owner.permissions)
 
-    return True
+    return permission_bitset.check(required_mask, token.owner.permissions)
 
 
 @lru_cache
@@ -140,12 +167,14 @@ def require_permissions(*permissions: str) -> params.Depends:
         require_permissions("user.own.update-info | user.update_info")
     """
 
+    required_mask = permission_bitset.required_mask(permissions)
+
     @permission_denied.mark
     def dependency(
         master_granted: bool = Depends(master_grant),
         token: Token | None = Depends(optional_token),
     ):
-        if not check_permissions(master_granted, token, *permissions):
+        if not check_permissions(master_granted, token, *permissions, required_mask=required_mask):
             raise permission_denied(extra=dict(permissions=", ".join(map(str, permissions))))
 
     setattr(dependency, "permissions", permissions)
@@ -193,6 +222,29 @@ def require_page(page: int = Query(1, ge=1, description="№ Сторінки"))
     return page
 
 
+def require_count_strategy(
+    count: Literal["exact", "estimate"] = Query(
+        "exact",
+        description="Підрахунок загальної кількості. estimate - оцінка планувальника для великих"
+        " результатів, точний підрахунок для малих",
+    )
+) -> str:
+    """Return count strategy provided by user"""
+    return count
+
+
+@invalid_cursor.mark
+def require_cursor(
+    cursor: str | None = Query(
+        None,
+        description="Курсор сторінки. Вмикає пагінацію курсором, порожній рядок - перша сторінка",
+        pattern="^[-_A-Za-z0-9]*$",
+    )
+) -> str | None:
+    """Return cursor provided by user, None if pagination by page number is used"""
+    return cursor
+
+
 @_variant_not_found.mark
 async def require_composition_variant(
     variant_id: int, session: AsyncSession = Depends(acquire_session)
@@ -239,36 +291,52 @@ def file_mime(file: UploadFile) -> str:
     return puremagic.from_stream(file.file, True, file.filename)
 
 
+async def _load_cached(namespace: str, key: str, coro, tags):
+    async with single_flight.lock(f"{namespace}:{key}") as acquired:
+        if not acquired:
+            # Other worker loads the same result, wait until it is cached
+            value = await single_flight.wait(lambda: result_cache.get(namespace, key), MISSING)
+            if value is not MISSING:
+                return value
+
+        value = await coro
+        await result_cache.set(namespace, key, value, tags)
+
+        return value
+
+
 @lru_cache
 def require_use_cache(key: str):
     """
-    Dependency generates function to save result of coroutines using cache key
+    Dependency generates function to save result of coroutines using cache key.
+
+    Concurrent misses of the same key are coalesced - coroutine of only one of them is awaited
 
     :param key: cache context key (can be used to drop cache)
-    :return: (tuple<Any, ...>, Awaitable<T>) -> Awaitable<T>
+    :return: (tuple<Any, ...>, Awaitable<T>, Iterable<str>) -> Awaitable<T>,
+        where last argument is tags result depends on (see ``ResultCache.invalidate``)
     """
 
-    def dependency(request: Request):
-        # Ignore not awaited coroutines
-        warnings.simplefilter("ignore", RuntimeWarning)
+    def dependency():
+        async def use_cache(cache_key, coro, tags=()):
+            hash_ = cache_key_hash(cache_key)
 
-        app: FastAPI = request.scope["app"]
+            try:
+                value = await result_cache.get(key, hash_)
+                if value is not MISSING:
+                    return value
 
-        if not hasattr(app, "user_cache"):
-            app.user_cache = {}
+                return await single_flight.run((key, hash_), _load_cached(key, hash_, coro, tags))
+            finally:
+                # Coroutine is not needed when result is cached or loaded by other request,
+                # close it so it isn't reported as never awaited
+                if (
+                    inspect.iscoroutine(coro)
+                    and inspect.getcoroutinestate(coro) == inspect.CORO_CREATED
+                ):
+                    coro.close()
 
-        cache = app.user_cache.setdefault(key, {})
-
-        async def use_cache(cache_key, coro):
-            nonlocal cache
-            key = cache_key_hash(cache_key)
-
-            if key in cache:
-                return cache[key]
-
-            return cache.setdefault(key, await coro)
-
-        yield use_cache
+        return use_cache
 
     return Depends(dependency)
 
@@ -279,19 +347,12 @@ def require_drop_cache(key: str):
     Drop all cache at specified key
     """
 
-    def dependency(request: Request):
-        app: FastAPI = request.scope["app"]
-        if not hasattr(app, "user_cache"):
-            app.user_cache = {}
-
-        cache = app.user_cache.setdefault(key, {})
-
+    async def dependency():
         async def drop_cache():
-            cache.clear()
+            await result_cache.drop(key)
 
         yield drop_cache
 
-        if cache:
-            cache.clear()
+        await result_cache.drop(key)
 
     return Depends(dependency)
@@ -1,20 +1,36 @@
 from datetime import datetime
 
 from sqlalchemy.ext.mutable import MutableList
-from sqlalchemy.dialects.postgresql import ARRAY
-from sqlalchemy import String, ForeignKey, event, Connection
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, TSVECTOR
+from sqlalchemy import Index, Computed, event, func, inspect, update, Connection
+from sqlalchemy import String, Integer, BigInteger, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column, relationship, column_property
 
 from src.models.base import Base
 from src.models.user import User
 from src.models import m2m_tables
 from src.models.image import UploadImage
 from src.models.content.genre import Genre
-from src.util import update_within_flush_event
+from src.util import update_within_flush_event, update_by_pk
+
+# Titles weigh more than synopses. "simple" configuration - titles are in different languages
+search_vector_expression = (
+    "setweight(to_tsvector('simple', "
+    "coalesce(title_original, '') || ' ' || coalesce(title_en, '') || ' ' || coalesce(title_uk, '')"
+    "), 'A') || "
+    "setweight(to_tsvector('simple', "
+    "coalesce(synopsis_en, '') || ' ' || coalesce(synopsis_uk, '')"
+    "), 'B')"
+)
 
 
 class Composition(Base):
     __tablename__ = "service_compositions"
+    __table_args__ = (
+        Index("ix_service_compositions_genre_ids", "genre_ids", postgresql_using="gin"),
+        Index("ix_service_compositions_tags", "tags", postgresql_using="gin"),
+        Index("ix_service_compositions_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     preview_id = mapped_column(ForeignKey(UploadImage.id, ondelete="SET NULL"), nullable=True)
     preview: Mapped[UploadImage] = relationship(UploadImage)
@@ -29,8 +45,13 @@ class Composition(Base):
     title_uk: Mapped[str] = mapped_column(index=True, nullable=True)
 
     # Synopses
-    synopsis_en: Mapped[str] = mapped_column(index=True, nullable=True)
-    synopsis_uk: Mapped[str] = mapped_column(index=True, nullable=True)
+    synopsis_en: Mapped[str] = mapped_column(nullable=True)
+    synopsis_uk: Mapped[str] = mapped_column(nullable=True)
+
+    # Full-text search document, maintained by database
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, Computed(search_vector_expression, persisted=True), deferred=True
+    )
 
     # Other fields
     status: Mapped[str]
@@ -38,6 +59,10 @@ class Composition(Base):
     start_date: Mapped[datetime] = mapped_column(index=True, nullable=True)
     nsfw: Mapped[bool] = mapped_column(index=True, default=False)
     genres: Mapped[list[Genre]] = relationship(secondary=m2m_tables.composition_genres)
+    # Denormalized ids of genres, kept in sync with genres relationship
+    genre_ids: Mapped[list[int]] = mapped_column(
+        ARRAY(BigInteger), default=list, server_default="{}"
+    )
     tags: Mapped[list[str]] = mapped_column(MutableList.as_mutable(ARRAY(String)))
     chapters: Mapped[int] = mapped_column(index=True, nullable=True)
     volumes: Mapped[int] = mapped_column(index=True, nullable=True)
@@ -55,6 +80,15 @@ class Composition(Base):
     score: Mapped[float] = mapped_column(default=0, index=True)
     scored_by: Mapped[int] = mapped_column(default=0, index=True)
 
+    # Rendered scheme.Composition, served by read endpoints. NULL - stale, rendered on next read
+    card: Mapped[dict | None] = mapped_column(JSONB, nullable=True, deferred=True)
+
+    # Sort keys. Not nullable, so they work with keyset pagination
+    sort_title: Mapped[str] = column_property(
+        func.coalesce(title_uk, title_en, title_original, type_=String)
+    )
+    sort_year: Mapped[int] = column_property(func.coalesce(year, 0, type_=Integer))
+
     @property
     def title(self):
         return self.title_uk or self.title_en or self.title_original
@@ -64,6 +98,39 @@ class Composition(Base):
         return self.synopsis_uk or self.synopsis_en
 
 
+# Composition list sorting, id is the tiebreaker
+Index("ix_service_compositions_sort_score", Composition.score, Composition.id)
+Index("ix_service_compositions_sort_scored_by", Composition.scored_by, Composition.id)
+Index("ix_service_compositions_sort_variants", Composition.variants, Composition.id)
+Index("ix_service_compositions_sort_year", Composition.sort_year.expression, Composition.id)
+Index("ix_service_compositions_sort_created_at", Composition.created_at, Composition.id)
+Index("ix_service_compositions_sort_title", Composition.sort_title.expression, Composition.id)
+
+
+@event.listens_for(Composition, "before_update")
+def _stale_card(_: type[Composition], __: Connection, composition: Composition):
+    state = inspect(composition)
+    if any(attr.history.has_changes() for attr in state.attrs if attr.key != "card"):
+        composition.card = None
+
+
+@event.listens_for(Genre, "before_update")
+def _stale_genre_cards(_: type[Genre], connection: Connection, genre: Genre):
+    connection.execute(
+        update(Composition).filter(Composition.genre_ids.contains([genre.id])).values(card=None)
+    )
+
+
+@event.listens_for(Composition.genres, "append")
+def _append_genre(composition: Composition, genre: Genre, _):
+    composition.genre_ids = [*(composition.genre_ids or []), genre.id]
+
+
+@event.listens_for(Composition.genres, "remove")
+def _remove_genre(composition: Composition, genre: Genre, _):
+    composition.genre_ids = [id_ for id_ in composition.genre_ids or [] if id_ != genre.id]
+
+
 class CompositionVariant(Base):
     __tablename__ = "service_composition_variants"
 
@@ -94,6 +161,7 @@ class CompositionVariant(Base):
 @event.listens_for(CompositionVariant, "before_insert")
 def _new_variant(_: type[CompositionVariant], connection: Connection, variant: CompositionVariant):
     update_within_flush_event(variant.origin, connection, variants=variant.origin.variants + 1)
+    connection.execute(update_by_pk(Composition, variant.origin.id, card=None))
 
 
 @event.listens_for(CompositionVariant, "before_delete")
@@ -101,3 +169,4 @@ def _remove_variant(
     _: type[CompositionVariant], connection: Connection, variant: CompositionVariant
 ):
     update_within_flush_event(variant.origin, connection, variants=variant.origin.variants - 1)
+    connection.execute(update_by_pk(Composition, variant.origin.id, card=None))
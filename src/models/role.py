@@ -11,6 +11,8 @@ class Role(Base):
     title: orm.Mapped[str]
     weight: orm.Mapped[int] = orm.mapped_column(server_default="0", index=True)
     default: orm.Mapped[bool] = orm.mapped_column(sa.Boolean, default=False)
+    # Bumped on every change of role, used as part of permission cache keys
+    version: orm.Mapped[int] = orm.mapped_column(default=0, server_default="0")
 
     # Role permissions
     # Keys are actual permission names
@@ -5,7 +5,7 @@ import sqlalchemy.orm as orm
 
 from .base import Base
 from .user import User
-from src.util import now
+from src.util import now, token_digest
 from .. import constants
 
 
@@ -13,11 +13,25 @@ class Token(Base):
     owner_id: orm.Mapped[int] = orm.mapped_column(sa.ForeignKey(User.id, ondelete="CASCADE"))
     owner: orm.Mapped[User] = orm.relationship(foreign_keys=[owner_id], back_populates="tokens")
 
-    body: orm.Mapped[str] = orm.mapped_column(index=True)
-    expire_at: orm.Mapped[datetime]
+    # SHA-256 of token body. Plain body is known only to the client
+    # and is kept on instance while request that presented it is processed
+    digest: orm.Mapped[bytes] = orm.mapped_column(sa.LargeBinary(32), index=True, unique=True)
+    expire_at: orm.Mapped[datetime] = orm.mapped_column(index=True)
 
     used_at: orm.Mapped[datetime] = orm.mapped_column(index=True, nullable=True)
 
+    @property
+    def body(self) -> str | None:
+        return getattr(self, "_body", None)
+
+    @body.setter
+    def body(self, value: str):
+        self._body = value
+
+        digest = token_digest(value)
+        if self.digest != digest:
+            self.digest = digest
+
     @property
     def token(self):
         return self.body
@@ -28,8 +42,14 @@ class Token(Base):
     def use(self):
         self.used_at = now()
 
-    def prolong(self):
+    def prolonged_expire_at(self) -> datetime | None:
+        """Return new expiration time if token is due to prolongation"""
         if self.expire_at - now() < timedelta(seconds=constants.TOKEN_PROLONG_INTERVAL):
-            return
+            return None
+
+        return now() + timedelta(seconds=constants.TOKEN_TTL)
 
-        self.expire_at = now() + timedelta(seconds=constants.TOKEN_TTL)
+    def prolong(self):
+        expire_at = self.prolonged_expire_at()
+        if expire_at is not None:
+            self.expire_at = expire_at
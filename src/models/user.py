@@ -11,7 +11,8 @@ from .base import Base
 from .role import Role
 from src import constants
 from .image import UploadImage
-from src.util import now, merge_permissions
+from src.presence import presence
+from src.util import now, merge_permissions, metric, LRUCache
 
 __all__ = ["User"]
 
@@ -19,16 +20,22 @@ if typing.TYPE_CHECKING:
     from .token import Token
 
 
+# Merged permissions keyed by (role id, role version, user's own permissions)
+_permissions_cache: LRUCache[tuple, dict[str, bool]] = LRUCache(
+    constants.USER_PERMISSIONS_CACHE_SIZE
+)
+
+
 def _user_next_offline():
-    return now() + timedelta(minutes=constants.USER_ONLINE_TTL)
+    return now() + timedelta(seconds=constants.USER_ONLINE_TTL)
 
 
 class User(Base):
     # Sign-in columns
     # Email can be null only if user logged in by oauth
-    email: orm.Mapped[str] = orm.mapped_column(index=True, nullable=True)
+    email: orm.Mapped[str] = orm.mapped_column(index=True, unique=True, nullable=True)
     # Public sign-in column (user can be found by it)
-    nickname: orm.Mapped[str] = orm.mapped_column(index=True)
+    nickname: orm.Mapped[str] = orm.mapped_column(index=True, unique=True)
     password_hash: orm.Mapped[str] = orm.mapped_column(nullable=True)
 
     pseudonym: orm.Mapped[str] = orm.mapped_column(index=True, nullable=True)
@@ -38,6 +45,9 @@ class User(Base):
         index=True, default=_user_next_offline(), onupdate=_user_next_offline
     )
 
+    # Signed tokens issued with older generation are revoked
+    token_generation: orm.Mapped[int] = orm.mapped_column(default=0, server_default="0")
+
     avatar_id: orm.Mapped[int] = orm.mapped_column(
         sa.ForeignKey(UploadImage.id, ondelete="SET NULL"), nullable=True
     )
@@ -55,13 +65,41 @@ class User(Base):
     )
 
     @property
-    def permissions(self):
-        """Combine user's role and own permissions."""
-        return merge_permissions(self.role.permissions, self.local_permissions)
+    def permissions(self) -> dict[str, bool]:
+        """
+        Combine user's role and own permissions.
+
+        Result is shared between users with same role version and own permissions
+        and must not be modified
+        """
+        role = self.role
+
+        # Unflushed changes are not reflected in role version
+        if sa.inspect(self).modified or sa.inspect(role).modified:
+            return merge_permissions(role.permissions, self.local_permissions)
+
+        key = (role.id, role.version, frozenset(self.local_permissions.items()))
+
+        permissions = _permissions_cache.get(key)
+        if permissions is None:
+            metric("user.permissions.cache.miss").observe()
+            permissions = merge_permissions(role.permissions, self.local_permissions)
+            _permissions_cache.set(key, permissions)
+
+        return permissions
+
+    @staticmethod
+    def forget_role_permissions(role_id: int) -> None:
+        """Drop cached permissions of users with role"""
+        for key, _ in _permissions_cache.items():
+            if key[0] == role_id:
+                _permissions_cache.pop(key)
 
     @property
     def online(self):
-        return now() < self.next_offline
+        online = presence.online(self.id)
+        if online is None:
+            # User was not seen since presence store was started - rely on last synced status
+            return now() < self.next_offline
 
-    def prolong_online(self):
-        self.next_offline = _user_next_offline()
+        return online
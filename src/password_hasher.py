@@ -0,0 +1,76 @@
+import time
+import asyncio
+from typing import Callable, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+
+from src import scheme
+from config import settings
+from src.util import secure_hash, verify_payload, metric
+
+T = TypeVar("T")
+
+password_hasher_overloaded = scheme.define_error(
+    "auth", "overloaded", "Too many authorization requests, try again later", 503
+)
+
+
+class PasswordHasher:
+    """
+    Run bcrypt in dedicated thread pool, so hashing doesn't block event loop.
+
+    bcrypt releases GIL while hashing, so workers run in parallel.
+    Calls that exceed ``workers + queue_size`` pending calls are rejected. Call stays pending
+    until its job is done, even if request that awaits it is cancelled
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.pending = 0
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="password-hasher")
+
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, name: str, func: Callable[..., T], *args) -> T:
+        if self.pending >= self.workers + self.queue_size:
+            metric("password_hasher.rejected").observe()
+            raise password_hasher_overloaded
+
+        self.pending += 1
+        metric("password_hasher.pending").observe(self.pending)
+
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+
+        job = self.executor.submit(func, *args)
+        job.add_done_callback(lambda _: loop.is_closed() or loop.call_soon_threadsafe(self._done))
+
+        try:
+            return await asyncio.wrap_future(job)
+        finally:
+            metric(f"password_hasher.{name}.latency").observe(time.perf_counter() - start)
+
+    def _done(self) -> None:
+        self.pending -= 1
+
+    async def hash(self, payload: str) -> str:
+        return await self._run("hash", secure_hash, payload)
+
+    async def verify(self, payload: str, payload_hash: str) -> bool:
+        return await self._run("verify", verify_payload, payload, payload_hash)
+
+
+password_hasher = PasswordHasher(
+    settings.password_hasher.workers,
+    settings.password_hasher.queue_size,
+)
@@ -1,4 +1,9 @@
-from src.util.permissions_util import Permission, parse_schema, generate_permissions
+from src.util.permissions_util import (
+    Permission,
+    parse_schema,
+    PermissionBitset,
+    generate_permissions,
+)
 
 permissions_schema = """
 *
@@ -59,3 +64,5 @@ override-author
 permissions = Permission(schema=parse_schema(permissions_schema))
 
 permission_registry = generate_permissions(permissions.schema).splitlines()
+
+permission_bitset = PermissionBitset(permission_registry)
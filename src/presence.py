@@ -0,0 +1,148 @@
+import time
+import asyncio
+import logging
+
+from redis.asyncio import Redis
+
+from src import constants
+from src.util import metric
+
+logger = logging.getLogger(__name__)
+
+
+class PresenceStore:
+    """
+    Online presence of users.
+
+    Presence lives in redis sorted set scored by last-seen timestamp. Each worker buffers
+    its own sightings and keeps local mirror of online users, which is refreshed on every sync,
+    so online status can be read without any IO. Without redis - local mirror is the store
+    """
+
+    key = "presence"
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self.redis: Redis | None = None
+        self.interval: float | None = None
+
+        # user id -> last seen timestamp
+        self.seen: dict[int, float] = {}
+        self.pending: dict[int, float] = {}
+
+        self._task: asyncio.Task | None = None
+
+    def setup(self, redis: Redis | None, interval: float | None = None) -> None:
+        self.redis = redis
+        self.interval = interval
+
+    def clear(self) -> None:
+        self.seen.clear()
+        self.pending.clear()
+
+    def start(self) -> None:
+        if self.redis is not None and self.interval is not None and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        await self.sync()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+
+            try:
+                await self.sync()
+            except Exception:  # noqa
+                logger.exception("Presence sync failed")
+
+    def touch(self, user_id: int) -> None:
+        """Mark user as seen right now"""
+        seen_at = time.time()
+        self.seen[user_id] = seen_at
+
+        if self.redis is not None:
+            self.pending[user_id] = seen_at
+
+    def online(self, user_id: int) -> bool | None:
+        """Online status of user, None if user is unknown to the store"""
+        seen_at = self.seen.get(user_id)
+        if seen_at is None:
+            return None
+
+        return time.time() - seen_at < self.ttl
+
+    def _prune(self) -> None:
+        border = time.time() - self.ttl
+        self.seen = {user_id: seen_at for user_id, seen_at in self.seen.items() if seen_at > border}
+
+    async def sync(self) -> None:
+        """Push buffered sightings to redis and refresh local mirror"""
+        if self.redis is None:
+            self._prune()
+            return
+
+        pending, self.pending = self.pending, {}
+        border = time.time() - self.ttl
+
+        start = time.perf_counter()
+
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                if pending:
+                    pipe.zadd(self.key, pending, gt=True)
+
+                pipe.zremrangebyscore(self.key, "-inf", border)
+                pipe.zrangebyscore(self.key, border, "+inf", withscores=True)
+
+                *_, online = await pipe.execute()
+        except Exception:
+            # Keep sightings for the next sync
+            for user_id, seen_at in pending.items():
+                self.pending[user_id] = max(seen_at, self.pending.get(user_id, seen_at))
+            raise
+
+        self.seen = {int(user_id): seen_at for user_id, seen_at in online}
+        self.seen.update(self.pending)
+
+        metric("presence.sync.size").observe(len(pending))
+        metric("presence.sync.latency").observe(time.perf_counter() - start)
+
+    async def snapshot(self) -> dict[int, float]:
+        """Last seen timestamps of online users"""
+        if self.redis is None:
+            self._prune()
+            return dict(self.seen)
+
+        online = await self.redis.zrangebyscore(
+            self.key, time.time() - self.ttl, "+inf", withscores=True
+        )
+
+        return {int(user_id): seen_at for user_id, seen_at in online}
+
+    async def count(self) -> int:
+        if self.redis is None:
+            self._prune()
+            return len(self.seen)
+
+        return await self.redis.zcount(self.key, time.time() - self.ttl, "+inf")
+
+    async def list(self, offset: int, limit: int) -> list[int]:
+        """Ids of online users, recently seen first"""
+        if self.redis is None:
+            self._prune()
+            users = sorted(self.seen, key=self.seen.__getitem__, reverse=True)
+            return users[offset : offset + limit]
+
+        users = await self.redis.zrevrangebyscore(
+            self.key, "+inf", time.time() - self.ttl, start=offset, num=limit
+        )
+
+        return [int(user_id) for user_id in users]
+
+
+presence = PresenceStore(constants.USER_ONLINE_TTL)
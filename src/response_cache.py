@@ -0,0 +1,132 @@
+from typing import Iterable
+
+from fastapi import Response
+from email.utils import parsedate_to_datetime
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Scope, Receive, Send, Message
+
+from src import constants
+from src.util import cache_key_hash, is_not_modified
+from src.result_cache import result_cache, MISSING
+
+SURROGATE_KEY = "Surrogate-Key"
+
+
+def set_surrogate_keys(response: Response, keys: Iterable[str]) -> None:
+    """
+    Mark response as cacheable for anonymous clients.
+
+    Response is dropped from cache (and CDN) when any of its surrogate keys is purged
+    """
+    response.headers[SURROGATE_KEY] = " ".join(keys)
+
+
+async def purge_surrogate_keys(keys: Iterable[str]) -> None:
+    """Drop cached responses marked with any of keys"""
+    await result_cache.invalidate(keys)
+
+
+class ResponseCacheMiddleware:
+    """
+    Serve GET responses of anonymous clients from cache, before routing and dependencies.
+
+    Only successful responses marked with surrogate keys (see ``set_surrogate_keys``) are cached,
+    keyed by path and query. Requests with token are never served from cache
+    """
+
+    namespace = "response"
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    @staticmethod
+    def cacheable(scope: Scope) -> bool:
+        return (
+            scope["type"] == "http"
+            and scope["method"] == "GET"
+            and not any(name == b"token" for name, _ in scope["headers"])
+        )
+
+    @staticmethod
+    def not_modified(scope: Scope, headers: list[tuple[str, str]]) -> bool:
+        validators = {name.lower(): value for name, value in headers}
+
+        last_modified = None
+        if "last-modified" in validators:
+            last_modified = parsedate_to_datetime(validators["last-modified"])
+
+        return is_not_modified(Headers(scope=scope), validators.get("etag"), last_modified)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.cacheable(scope):
+            await self.app(scope, receive, send)
+            return
+
+        key = cache_key_hash((scope["path"], scope["query_string"].decode("latin-1")))
+
+        cached = await result_cache.get(self.namespace, key)
+        if cached is not MISSING:
+            status, headers, body = cached
+
+            if self.not_modified(scope, headers):
+                # Client's copy is up to date, validators and surrogate keys only
+                status, body = 304, ""
+                headers = [
+                    (name, value)
+                    for name, value in headers
+                    if name.lower() in ("etag", "last-modified", SURROGATE_KEY.lower())
+                ]
+
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": status,
+                    "headers": [
+                        *(
+                            (name.encode("latin-1"), value.encode("latin-1"))
+                            for name, value in headers
+                        ),
+                        (b"x-cache", b"HIT"),
+                    ],
+                }
+            )
+            await send({"type": "http.response.body", "body": body.encode()})
+            return
+
+        start: Message | None = None
+        chunks: list[bytes] = []
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start
+
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+        if start is None or start["status"] != 200:
+            return
+
+        headers = [
+            (name.decode("latin-1"), value.decode("latin-1")) for name, value in start["headers"]
+        ]
+        surrogate_keys = [value for name, value in headers if name.lower() == SURROGATE_KEY.lower()]
+        if not surrogate_keys or any(name.lower() == "set-cookie" for name, _ in headers):
+            return
+
+        try:
+            body = b"".join(chunks).decode()
+        except UnicodeDecodeError:
+            return
+
+        await result_cache.set(
+            self.namespace,
+            key,
+            (200, headers, body),
+            surrogate_keys[0].split(),
+            constants.RESPONSE_CACHE_TTL,
+        )
@@ -0,0 +1,266 @@
+import json
+import zlib
+import asyncio
+import logging
+from typing import Any, Iterable
+
+from redis.asyncio import Redis
+
+from src import constants
+from src.util import LRUCache, metric
+
+logger = logging.getLogger(__name__)
+
+# Returned when key is not cached, as None is valid cached value
+MISSING = object()
+
+# Cached value and tags it depends on
+Entry = tuple[Any, tuple[str, ...]]
+
+
+class MemoryCacheBackend:
+    """Bounded LRU with TTL in worker's memory"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.data: LRUCache[tuple[str, str], Entry] = LRUCache(maxsize, ttl)
+
+    async def get(self, namespace: str, key: str) -> Entry | None:
+        return self.data.get((namespace, key))
+
+    async def set(
+        self, namespace: str, key: str, value: Any, tags: tuple[str, ...], ttl: float | None = None
+    ) -> None:
+        self.data.set((namespace, key), (value, tags), ttl)
+        metric("result_cache.entries").observe(len(self.data))
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        tags = set(tags)
+        for key, (_, entry_tags) in self.data.items():
+            if not tags.isdisjoint(entry_tags):
+                self.data.pop(key)
+
+    async def drop(self, namespace: str) -> None:
+        for key, _ in self.data.items():
+            if key[0] == namespace:
+                self.data.pop(key)
+
+    def clear(self) -> None:
+        self.data.clear()
+
+
+class RedisCacheBackend:
+    """
+    Cache shared by all workers.
+
+    Values are stored as JSON (tuples are restored as lists), payloads above compression
+    threshold are compressed with zlib. Keys of each namespace and tag are tracked in sets,
+    so entries can be dropped without scanning keyspace
+    """
+
+    prefix = "result-cache"
+
+    def __init__(self, redis: Redis, ttl: int, compress_threshold: int):
+        self.redis = redis
+        self.ttl = ttl
+        self.compress_threshold = compress_threshold
+
+    def encode(self, value: Any, tags: tuple[str, ...]) -> bytes:
+        raw = json.dumps([value, tags], ensure_ascii=False, separators=(",", ":")).encode()
+        if len(raw) > self.compress_threshold:
+            return b"z" + zlib.compress(raw)
+
+        return b"j" + raw
+
+    @staticmethod
+    def decode(payload: bytes) -> Entry:
+        raw = payload[1:]
+        if payload[:1] == b"z":
+            raw = zlib.decompress(raw)
+
+        value, tags = json.loads(raw)
+
+        return value, tuple(tags)
+
+    async def get(self, namespace: str, key: str) -> Entry | None:
+        payload = await self.redis.get(f"{self.prefix}:{namespace}:{key}")
+        if payload is None:
+            return None
+
+        return self.decode(payload)
+
+    async def set(
+        self, namespace: str, key: str, value: Any, tags: tuple[str, ...], ttl: int | None = None
+    ) -> None:
+        payload = self.encode(value, tags)
+        full_key = f"{self.prefix}:{namespace}:{key}"
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(full_key, payload, ex=ttl or self.ttl)
+
+            for group_key in (
+                f"{self.prefix}:{namespace}",
+                *(f"{self.prefix}:tag:{tag}" for tag in tags),
+            ):
+                pipe.sadd(group_key, full_key)
+                pipe.expire(group_key, self.ttl)
+
+            await pipe.execute()
+
+        metric("result_cache.bytes").observe(len(payload))
+
+    async def _drop_groups(self, group_keys: list[str]) -> None:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for group_key in group_keys:
+                pipe.smembers(group_key)
+
+            groups = await pipe.execute()
+
+        keys = {key.decode() for group in groups for key in group}
+
+        await self.redis.delete(*group_keys, *keys)
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        await self._drop_groups([f"{self.prefix}:tag:{tag}" for tag in tags])
+
+    async def drop(self, namespace: str) -> None:
+        await self._drop_groups([f"{self.prefix}:{namespace}"])
+
+    def clear(self) -> None:
+        pass
+
+
+class ResultCache:
+    """
+    Results of coroutines cached by require_use_cache, grouped by namespace.
+
+    Each entry carries tags of data it depends on (e.g. "genre:drama"), writes invalidate
+    only entries with affected tags.
+
+    Without redis results are kept in worker's memory. With redis results are shared by all
+    workers, and each worker keeps short-living local copies of hot entries. Invalidations
+    are published to all workers, so they drop their local copies too
+    """
+
+    channel = "result-cache:invalidate"
+
+    def __init__(self, maxsize: int, ttl: int, local_ttl: float, compress_threshold: int):
+        self.ttl = ttl
+        self.compress_threshold = compress_threshold
+
+        self.local = MemoryCacheBackend(maxsize, ttl)
+        self.local_ttl = local_ttl
+        self.maxsize = maxsize
+
+        self.backend: MemoryCacheBackend | RedisCacheBackend = self.local
+        self.redis: Redis | None = None
+
+        self._task: asyncio.Task | None = None
+
+    def setup(self, redis: Redis | None) -> None:
+        self.redis = redis
+
+        if redis is None:
+            self.local = MemoryCacheBackend(self.maxsize, self.ttl)
+            self.backend = self.local
+        else:
+            self.local = MemoryCacheBackend(self.maxsize, self.local_ttl)
+            self.backend = RedisCacheBackend(redis, self.ttl, self.compress_threshold)
+
+    def clear(self) -> None:
+        self.local.clear()
+
+    def start(self) -> None:
+        if self.redis is not None and self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            await self._apply(json.loads(message["data"]))
+
+            except asyncio.CancelledError:
+                raise
+            except Exception:  # noqa
+                logger.exception("Result cache invalidation listener failed")
+                # Invalidations could be missed, local copies can't be trusted
+                self.local.clear()
+                await asyncio.sleep(1)
+
+    async def _apply(self, event: dict[str, Any]) -> None:
+        if "namespace" in event:
+            await self.local.drop(event["namespace"])
+        else:
+            await self.local.invalidate(event["tags"])
+
+    async def _publish(self, event: dict[str, Any]) -> None:
+        await self._apply(event)
+
+        if self.redis is not None:
+            await self.redis.publish(self.channel, json.dumps(event))
+
+    async def get(self, namespace: str, key: str) -> Any:
+        """Cached value or MISSING"""
+        entry = await self.local.get(namespace, key)
+
+        if entry is None and self.backend is not self.local:
+            entry = await self.backend.get(namespace, key)
+            if entry is not None:
+                await self.local.set(namespace, key, *entry)
+
+        metric(f"result_cache.{namespace}.{'miss' if entry is None else 'hit'}").observe()
+
+        return MISSING if entry is None else entry[0]
+
+    async def set(
+        self,
+        namespace: str,
+        key: str,
+        value: Any,
+        tags: Iterable[str] = (),
+        ttl: int | None = None,
+    ) -> None:
+        """Cache value for ttl (default - cache's ttl)"""
+        tags = tuple(tags)
+
+        if self.backend is not self.local:
+            await self.backend.set(namespace, key, value, tags, ttl)
+            ttl = self.local_ttl if ttl is None else min(ttl, self.local_ttl)
+
+        await self.local.set(namespace, key, value, tags, ttl)
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        """Drop entries that depend on any of tags, on all workers"""
+        tags = sorted(set(tags))
+        if not tags:
+            return
+
+        if self.backend is not self.local:
+            await self.backend.invalidate(tags)
+
+        await self._publish({"tags": tags})
+        metric("result_cache.invalidated_tags").observe(len(tags))
+
+    async def drop(self, namespace: str) -> None:
+        """Drop all entries of namespace, on all workers"""
+        if self.backend is not self.local:
+            await self.backend.drop(namespace)
+
+        await self._publish({"namespace": namespace})
+
+
+result_cache = ResultCache(
+    constants.RESULT_CACHE_SIZE,
+    constants.RESULT_CACHE_TTL,
+    constants.RESULT_CACHE_LOCAL_TTL,
+    constants.RESULT_CACHE_COMPRESS_THRESHOLD,
+)
@@ -4,8 +4,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from . import service
 from src import scheme
+from src.models import User
 from src.database import acquire_session
-from src.util import verify_payload, has_errors
+from src.util import has_errors
+from src.password_hasher import password_hasher, password_hasher_overloaded
 
 from .scheme import (
     SignUpBody,
@@ -13,7 +15,6 @@ from .scheme import (
     SignInEmailBody,
     SignInNicknameBody,
 )
-from src.service import get_default_role
 
 define_error = scheme.define_error_category("auth")
 default_role_not_exist = scheme.define_error(
@@ -26,25 +27,53 @@ email_occupied = define_error("email-occupied", "Email occupied", 400)
 nickname_occupied = define_error("nickname-occupied", "Nickname occupied", 400)
 user_not_found = define_error("user-not-found", "User not found", 404)
 password_incorrect = define_error("password-incorrect", "Password incorrect", 400)
+user_not_created = define_error("user-not-created", "User could not be created", 500)
 
 
-@has_errors(email_occupied, nickname_occupied, default_role_not_exist)
-async def validate_signup(
-    body: SignUpBody, session: AsyncSession = Depends(acquire_session)
-) -> SignUpBody:
-    if await get_default_role(session) is None:
+async def check_signup_conflicts(session: AsyncSession, body: SignUpBody) -> None:
+    default_role_exists, email_taken, nickname_taken = await service.get_signup_conflicts(
+        session, body
+    )
+
+    if not default_role_exists:
         raise default_role_not_exist
 
-    if await service.get_user_by_email(session, body.email) is not None:
+    if email_taken:
         raise email_occupied
 
-    if await service.get_user_by_nickname(session, body.nickname) is not None:
+    if nickname_taken:
         raise nickname_occupied
 
-    return body
+
+@has_errors(
+    email_occupied,
+    nickname_occupied,
+    default_role_not_exist,
+    user_not_created,
+    password_hasher_overloaded,
+)
+async def require_signup_user(
+    body: SignUpBody, session: AsyncSession = Depends(acquire_session)
+) -> User:
+    """
+    Create user from signup body.
+
+    Conflicts are checked before password is hashed, so taken email or nickname cost no hashing.
+    Concurrent signups with the same email or nickname are caught by unique constraints on insert
+    """
+    await check_signup_conflicts(session, body)
+
+    user = await service.create_user(session, body)
+    if user is not None:
+        return user
+
+    # Lost race to concurrent signup
+    await check_signup_conflicts(session, body)
+
+    raise user_not_created
 
 
-@has_errors(password_incorrect, user_not_found)
+@has_errors(password_incorrect, user_not_found, password_hasher_overloaded)
 async def validate_signin(
     body: SignInBody,
     session: AsyncSession = Depends(acquire_session),
@@ -60,7 +89,7 @@ async def validate_signin(
     if user is None:
         raise user_not_found
 
-    if not verify_payload(body.password, user.password_hash):
+    if not await password_hasher.verify(body.password, user.password_hash):
         raise password_incorrect
 
     context.ignore_hit()  # ignore success hits
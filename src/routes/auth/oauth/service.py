@@ -1,11 +1,11 @@
 import secrets
-from dataclasses import replace
 
-from sqlalchemy import select
+from sqlalchemy import select, any_
+from sqlalchemy.dialects.postgresql import insert, array
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
-from src.service import get_user_by_nickname
+from src import constants
 from src.routes.auth.service import get_user_by_email
 from src.oauth_providers import OAuthUser, OAuthToken
 from src.models import OAuthIdentity, User, ThirdpartyToken, Role
@@ -21,6 +21,52 @@ async def get_oauth_identity(
     )
 
 
+def nickname_candidates(nickname: str) -> list[str]:
+    """Nickname itself, nickname with random suffixes and completely random nickname"""
+    return [
+        nickname,
+        *(f"{nickname}_{secrets.token_hex(4)}" for _ in range(constants.NICKNAME_CANDIDATES)),
+        secrets.token_hex(12),
+    ]
+
+
+async def insert_oauth_user(session: AsyncSession, oauth_user: OAuthUser, role: Role) -> User:
+    """
+    Create user with first free nickname candidate.
+
+    All candidates are checked with one query, conflicts with concurrent inserts
+    are caught by unique constraints and retried with new candidates
+    """
+    while True:
+        candidates = nickname_candidates(oauth_user.nickname)
+        taken = set(
+            await session.scalars(
+                select(User.nickname).filter(User.nickname == any_(array(candidates)))
+            )
+        )
+
+        for nickname in candidates:
+            if nickname not in taken:
+                break
+        else:
+            continue
+
+        user = await session.scalar(
+            insert(User)
+            .values(email=oauth_user.email, nickname=nickname, role_id=role.id)
+            .on_conflict_do_nothing()
+            .returning(User)
+        )
+        if user is not None:
+            return user
+
+        # User with that email was created concurrently
+        if oauth_user.email:
+            user = await get_user_by_email(session, oauth_user.email)
+            if user is not None:
+                return user
+
+
 async def create_oauth_user(
     session: AsyncSession, provider: str, oauth_user: OAuthUser, role: Role
 ) -> OAuthIdentity:
@@ -31,24 +77,7 @@ async def create_oauth_user(
         user = await get_user_by_email(session, oauth_user.email)
 
     if user is None:
-        for i in range(4):
-            # If user with that nickname does not exist - break
-            if not await get_user_by_nickname(session, oauth_user.nickname):
-                break
-
-            # If it is first iteration - add _ to end of username to split nickname and our random chars
-            if i == 0:
-                oauth_user = replace(oauth_user, nickname=oauth_user.nickname + "_")
-
-            # Add 4 random chars to end of username
-            oauth_user = replace(oauth_user, nickname=oauth_user.nickname + secrets.token_hex(4))
-        else:
-            # Generate completely new username, if steps above doesn't help make it unique
-            oauth_user = replace(oauth_user, nickname=secrets.token_hex(12))
-
-        user = User(email=oauth_user.email, nickname=oauth_user.nickname, role=role)
-
-        session.add(user)
+        user = await insert_oauth_user(session, oauth_user, role)
 
     identity = OAuthIdentity(
         user=user,
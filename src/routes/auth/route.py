@@ -7,12 +7,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from . import service
 from src import scheme
 from tasks import new_login
-from .scheme import SignUpBody
 from src.models import User, Token
 from src.database import acquire_session
 from src.dependencies import require_token, client_details
 
-from .dependencies import validate_signin, validate_signup
+from .dependencies import validate_signin, require_signup_user
 
 router = fastapi.APIRouter(
     prefix="/auth",
@@ -27,11 +26,9 @@ router = fastapi.APIRouter(
     operation_id="signup",
 )
 async def signup(
-    body: SignUpBody = Depends(validate_signup),
+    user: User = Depends(require_signup_user),
     session: AsyncSession = Depends(acquire_session),
 ) -> scheme.Token:
-    user = await service.create_user(session, body)
-
     return await service.create_token(session, user)
 
 
@@ -76,3 +73,18 @@ async def signin(
 )
 async def token_info(token: Token = Depends(require_token)):
     return token
+
+
+@router.post(
+    "/token/revoke",
+    response_model=scheme.Token,
+    summary="Відкликати всі токени",
+    operation_id="revoke_tokens",
+)
+async def revoke_tokens(
+    token: Token = Depends(require_token),
+    session: AsyncSession = Depends(acquire_session),
+):
+    await service.revoke_tokens(session, token.owner)
+
+    return token
@@ -3,47 +3,100 @@ from datetime import timedelta
 
 import sqlalchemy as sa
 from sqlalchemy.orm import joinedload
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .scheme import SignUpBody
 from src import constants
-from src.models import User, Token
-from src.util import secure_hash, now
-from src.service import get_default_role, get_user_by_nickname
+from src.models import User, Token, Role
+from src.token_cache import token_cache
+from src.util import now, sign_token
+from src.password_hasher import password_hasher
+from src.signed_tokens import signed_tokens_enabled, token_key, token_generations
+from src.service import get_user_by_nickname
 
 __all__ = [
     "create_user",
+    "get_signup_conflicts",
     "create_token",
+    "revoke_tokens",
     "get_user_by_email",
     "get_user_by_nickname",
 ]
 
 
-async def create_user(session: AsyncSession, body: SignUpBody) -> User:
-    user = User(
-        email=body.email,
-        nickname=body.nickname,
-        password_hash=secure_hash(body.password),
-        role=await get_default_role(session),
+async def create_user(session: AsyncSession, body: SignUpBody) -> User | None:
+    """
+    Create user with default role in single statement.
+
+    Returns None if email or nickname is occupied or default role doesn't exist
+    """
+    password_hash = await password_hasher.hash(body.password)
+
+    default_role = (
+        sa.select(
+            sa.literal(body.email),
+            sa.literal(body.nickname),
+            sa.literal(password_hash),
+            Role.id,
+        )
+        .filter(Role.default)
+        .limit(1)
     )
-    session.add(user)
-    await session.commit()
 
-    return user
+    return await session.scalar(
+        insert(User)
+        .from_select(["email", "nickname", "password_hash", "role_id"], default_role)
+        .on_conflict_do_nothing()
+        .returning(User)
+    )
 
 
-async def create_token(session: AsyncSession, user: User) -> Token:
-    token = Token(
-        owner_id=user.id,
-        expire_at=now() + timedelta(seconds=constants.TOKEN_TTL),
-        body=secrets.token_hex(64),
+async def get_signup_conflicts(session: AsyncSession, body: SignUpBody) -> sa.Row:
+    """Explain why user wasn't created: (default role exists, email occupied, nickname occupied)"""
+    result = await session.execute(
+        sa.select(
+            sa.exists().where(Role.default),
+            sa.exists().where(User.email == body.email),
+            sa.exists().where(User.nickname == body.nickname),
+        )
     )
+
+    return result.one()
+
+
+async def create_token(session: AsyncSession, user: User) -> Token:
+    expire_at = now() + timedelta(seconds=constants.TOKEN_TTL)
+
+    if signed_tokens_enabled():
+        # Signed tokens carry expiration time with seconds precision
+        expire_at = expire_at.replace(microsecond=0)
+        body = sign_token(token_key(), user.id, user.token_generation, expire_at)
+    else:
+        body = secrets.token_hex(64)
+
+    token = Token(owner_id=user.id, expire_at=expire_at, body=body)
     session.add(token)
     await session.commit()
 
     return token
 
 
+async def revoke_tokens(session: AsyncSession, user: User) -> None:
+    """Revoke all tokens of user"""
+    generation = await session.scalar(
+        sa.update(User)
+        .filter_by(id=user.id)
+        .values(token_generation=User.token_generation + 1)
+        .returning(User.token_generation)
+    )
+    await session.execute(sa.delete(Token).filter_by(owner_id=user.id))
+    await session.commit()
+
+    await token_generations.set(user.id, generation)
+    await token_cache.drop_user(user.id)
+
+
 async def get_user_by_email(session: AsyncSession, email: str) -> User | None:
     return await session.scalar(
         sa.select(User).filter_by(email=email).options(joinedload(User.avatar))
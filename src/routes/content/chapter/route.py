@@ -1,5 +1,5 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from fastapi import APIRouter, Depends, UploadFile
+from fastapi import APIRouter, Depends, UploadFile, Request, Response
 
 from . import service
 from src import scheme
@@ -7,7 +7,9 @@ from src.models import Chapter, Volume
 from src.permissions import permissions
 from .scheme import PublishTextPageBody
 from src.database import acquire_session
-from src.util import get_offset_and_limit, paginated_response
+from src.response_cache import set_surrogate_keys
+from src.util import get_offset_and_limit, paginated_response, cursor_response
+from src.util import check_not_modified, make_etag
 
 from .dependencies import (
     validate_image_page_file,
@@ -19,12 +21,12 @@ from .dependencies import (
 from src.dependencies import (
     file_mime,
     require_page,
+    require_cursor,
     require_volume,
     require_chapter,
     require_permissions,
 )
 
-
 router = APIRouter(prefix="/chapter")
 
 
@@ -32,15 +34,27 @@ router = APIRouter(prefix="/chapter")
     "/list/{volume_id}",
     summary="Отримати розділи тому твору",
     operation_id="list_chapters",
-    response_model=scheme.Paginated[scheme.Chapter],
+    response_model=scheme.Paginated[scheme.Chapter] | scheme.CursorPaginated[scheme.Chapter],
 )
 async def list_chapters(
+    request: Request,
+    response: Response,
     volume: Volume = Depends(require_volume),
     page: int = Depends(require_page),
+    cursor: str | None = Depends(require_cursor),
     session: AsyncSession = Depends(acquire_session),
 ):
     offset, limit = get_offset_and_limit(page)
 
+    set_surrogate_keys(response, [f"volume:{volume.id}"])
+
+    latest, size = await service.chapters_version(session, volume.id)
+    check_not_modified(request, response, make_etag("chapters", volume.id, latest, size), latest)
+
+    if cursor is not None:
+        items = await service.list_chapters_after(session, volume.id, cursor, limit)
+        return cursor_response(items.all(), limit, service.chapter_keys)
+
     items = await service.list_chapters(session, volume.id, offset, limit)
 
     return paginated_response(items.all(), volume.chapters, page, limit)
@@ -52,7 +66,16 @@ async def list_chapters(
     operation_id="get_chapter",
     response_model=scheme.Chapter,
 )
-async def get_chapter(chapter: Chapter = Depends(require_chapter)):
+async def get_chapter(
+    request: Request, response: Response, chapter: Chapter = Depends(require_chapter)
+):
+    set_surrogate_keys(response, [f"chapter:{chapter.id}"])
+    check_not_modified(
+        request,
+        response,
+        make_etag("chapter", chapter.id, chapter.updated_at, chapter.pages),
+        chapter.updated_at or chapter.created_at,
+    )
     return chapter
 
 
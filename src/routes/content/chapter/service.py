@@ -17,9 +17,13 @@ from src.models import (
 )
 
 from src.scheme import APIError
-from src.util import upload_file_obj
+from src.util import upload_file_obj, keyset_paginate, collection_version, last_modified
+from src.response_cache import purge_surrogate_keys
 from src.service import get_composition_variant_by_chapter_id
 
+# Keys of cursor pagination
+chapter_keys = (Chapter.index, Chapter.id)
+
 
 def chapter_filters(query: Select, volume_id: int):
     return query.filter(Chapter.volume_id == volume_id)
@@ -29,6 +33,12 @@ def chapter_options(query: Select):
     return query
 
 
+async def chapters_version(session: AsyncSession, volume_id: int):
+    return await collection_version(
+        session, chapter_filters(select(Chapter), volume_id), last_modified(Chapter)
+    )
+
+
 async def list_chapters(
     session: AsyncSession, volume_id: int, offset: int, limit: int
 ) -> ScalarResult[Volume]:
@@ -40,6 +50,22 @@ async def list_chapters(
     )
 
 
+async def list_chapters_after(
+    session: AsyncSession, volume_id: int, cursor: str, limit: int
+) -> ScalarResult[Chapter]:
+    return await session.scalars(
+        chapter_filters(
+            chapter_options(keyset_paginate(select(Chapter), chapter_keys, cursor, limit)),
+            volume_id,
+        )
+    )
+
+
+def chapter_surrogate_keys(chapter: Chapter) -> list[str]:
+    """Keys of responses with chapter - chapter itself, its pages and chapters of its volume"""
+    return [f"chapter:{chapter.id}", f"volume:{chapter.volume_id}"]
+
+
 async def create_text_page(session: AsyncSession, chapter: Chapter, body):
     page = TextPage(chapter=chapter, index=body.index, text=body.text)
 
@@ -47,6 +73,8 @@ async def create_text_page(session: AsyncSession, chapter: Chapter, body):
 
     await session.commit()
 
+    await purge_surrogate_keys(chapter_surrogate_keys(chapter))
+
     return page
 
 
@@ -83,4 +111,6 @@ async def create_image_page(
 
     await session.commit()
 
+    await purge_surrogate_keys(chapter_surrogate_keys(chapter))
+
     return page
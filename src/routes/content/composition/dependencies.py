@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from . import service
 from src.models import Composition
 from src.database import acquire_session
+from src.single_flight import single_flight
 from ..dependencies import require_provider
 from src.scheme import define_error_category
 from src.content_providers import BaseContentProvider
@@ -44,3 +45,17 @@ async def require_composition(
         raise composition_not_found
 
     return composition
+
+
+@composition_not_found.mark
+async def require_composition_card(
+    slug: str,
+    session: AsyncSession = Depends(acquire_session),
+) -> dict:
+    card = await single_flight.run(
+        ("composition-card", slug), service.get_composition_card(session, slug)
+    )
+    if card is None:
+        raise composition_not_found
+
+    return card
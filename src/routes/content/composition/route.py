@@ -1,26 +1,43 @@
+import json
+
 from fastapi.params import Depends
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from . import service
-from src import scheme
+from src import scheme, constants
 from src.permissions import permissions
 from src.models import Composition, Token
+from src.suggest import suggest_index
+from src.result_cache import result_cache
+from src.response_cache import set_surrogate_keys
+from src.catalog_snapshot import catalog_snapshot
 from src.database import acquire_session
 from ..dependencies import require_provider
-from .scheme import CreateCompositionVariantBody, CompositionListBody
-from src.util import paginated_response, get_offset_and_limit, UseCache
+from src.util import paginated_response, get_offset_and_limit, UseCache, cursor_response
+from src.util import check_not_modified, make_etag, from_utc_timestamp
 from src.content_providers import SearchEntry, BaseContentProvider, ContentProviderComposition
 
+from .scheme import (
+    CompositionBatch,
+    CompositionFacets,
+    CompositionListBody,
+    CompositionSearchBody,
+    CompositionBatchBody,
+    CompositionSuggestion,
+    CreateCompositionVariantBody,
+)
 from .dependencies import (
     require_composition,
+    require_composition_card,
     require_provider_composition,
 )
 from src.dependencies import (
     require_page,
+    require_cursor,
+    require_count_strategy,
     require_token,
     require_use_cache,
-    require_drop_cache,
     require_permissions,
 )
 
@@ -46,13 +63,57 @@ async def get_search_provider(
     summary="Опублікувати твір використовуючи інформацію з провайдера контенту",
     response_model=scheme.Composition,
     operation_id="publish_composition_from_provider",
-    dependencies=[require_drop_cache("composition")],
 )
 async def publish_composition_from_provider(
     provider_composition: ContentProviderComposition = Depends(require_provider_composition),
     session: AsyncSession = Depends(acquire_session),
 ):
-    return await service.publish_composition_from_provider(session, provider_composition)
+    composition = await service.publish_composition_from_provider(session, provider_composition)
+
+    suggest_index.add(composition)
+    await catalog_snapshot.refresh(session)
+    await result_cache.invalidate(service.composition_cache_tags(composition))
+
+    cards = await service.refresh_cards(session, [composition.id])
+
+    return cards[composition.id]
+
+
+@router.get(
+    "/suggest",
+    summary="Підказати твори за початком назви",
+    response_model=list[CompositionSuggestion],
+    operation_id="suggest_compositions",
+)
+async def suggest_compositions(
+    query: str = Query(min_length=1, max_length=255, description="Початок назви твору"),
+    limit: int = Query(constants.SUGGEST_LIMIT, ge=1, le=constants.SUGGEST_LIMIT_MAX),
+):
+    return suggest_index.suggest(query, limit)
+
+
+@router.post(
+    "/batch",
+    summary="Отримати твори за ідентифікаторами або слаґами",
+    response_model=CompositionBatch,
+    operation_id="get_compositions_batch",
+)
+async def get_compositions_batch(
+    body: CompositionBatchBody,
+    session: AsyncSession = Depends(acquire_session),
+):
+    ids = [key for key in body.keys if isinstance(key, int)]
+    slugs = [key for key in body.keys if isinstance(key, str)]
+
+    found = {}
+    for card in await service.get_composition_cards_by_keys(session, ids, slugs):
+        found.setdefault(card["id"], card)
+        found.setdefault(card["slug"], card)
+
+    return {
+        "items": [found[key] for key in dict.fromkeys(body.keys) if key in found],
+        "missing": [key for key in dict.fromkeys(body.keys) if key not in found],
+    }
 
 
 @router.get(
@@ -61,14 +122,28 @@ async def publish_composition_from_provider(
     response_model=scheme.Composition,
     operation_id="get_composition",
 )
-async def get_composition(composition: Composition = Depends(require_composition)):
-    return composition
+async def get_composition(
+    request: Request, response: Response, card: dict = Depends(require_composition_card)
+):
+    set_surrogate_keys(response, [f"composition:{card['id']}"])
+
+    # Card timestamps have seconds precision, so two updates within a second would share
+    # validators built from them. Card is what client gets, so it is the version itself
+    check_not_modified(
+        request,
+        response,
+        make_etag("composition", json.dumps(card, sort_keys=True)),
+        from_utc_timestamp(card["updated_at"] or card["created_at"]),
+    )
+    return card
 
 
 @router.post(
     "/list",
     summary="Отримати список творів",
-    response_model=scheme.Paginated[scheme.Composition],
+    response_model=(
+        scheme.Paginated[scheme.Composition] | scheme.CursorPaginated[scheme.Composition]
+    ),
     operation_id="list_composition",
 )
 async def list_compositions(
@@ -76,13 +151,67 @@ async def list_compositions(
     session: AsyncSession = Depends(acquire_session),
     use_cache: UseCache = require_use_cache("composition"),
     page: int = Depends(require_page),
+    cursor: str | None = Depends(require_cursor),
+    count_strategy: str = Depends(require_count_strategy),
 ):
     offset, limit = get_offset_and_limit(page)
 
-    total = await use_cache(body.cache_key(), service.count_compositions(session, body))
-    items = await service.list_compositions(session, body, offset, limit)
+    if cursor is not None:
+        items = await service.list_compositions_after(session, body, cursor, limit)
+        return cursor_response(items.all(), limit, service.composition_keys(body))
 
-    return paginated_response(items.all(), total, page, limit)
+    if catalog_snapshot.supports(body):
+        ids, total = catalog_snapshot.filter(body, offset, limit)
+        items = await service.get_composition_cards(session, ids)
+        return paginated_response(items, total, page, limit)
+
+    total, exact = await use_cache(
+        (count_strategy, *body.cache_key()),
+        service.count_compositions(session, body, count_strategy),
+        service.filters_cache_tags(body),
+    )
+    items = await service.list_composition_cards(session, body, offset, limit)
+
+    return paginated_response(items, total, page, limit, exact)
+
+
+@router.post(
+    "/search",
+    summary="Здійснити пошук творів",
+    response_model=scheme.CursorPaginated[scheme.Composition],
+    operation_id="search_compositions",
+)
+async def search_compositions(
+    body: CompositionSearchBody,
+    session: AsyncSession = Depends(acquire_session),
+    cursor: str | None = Depends(require_cursor),
+):
+    _, limit = get_offset_and_limit(1)
+
+    keys, rows = await service.search_compositions(session, body, cursor or "", limit)
+
+    response = cursor_response(rows.all(), limit, keys)
+    response["items"] = [row.Composition for row in response["items"]]
+
+    return response
+
+
+@router.post(
+    "/facets",
+    summary="Отримати кількість творів за жанрами, стилями, теґами та роками",
+    response_model=CompositionFacets,
+    operation_id="composition_facets",
+)
+async def composition_facets(
+    body: CompositionListBody,
+    session: AsyncSession = Depends(acquire_session),
+    use_cache: UseCache = require_use_cache("composition"),
+):
+    return await use_cache(
+        ("facets", *body.cache_key()),
+        service.count_facets(session, body),
+        service.filters_cache_tags(body),
+    )
 
 
 @router.post(
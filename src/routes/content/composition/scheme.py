@@ -1,8 +1,10 @@
+from typing import Literal
+
 from pydantic import Field, field_validator
 from pydantic_core.core_schema import ValidationInfo
 
-from src import util
-from src.scheme import SchemeModel
+from src import util, constants
+from src.scheme import SchemeModel, Composition
 
 
 class CreateCompositionVariantBody(SchemeModel):
@@ -14,6 +16,36 @@ class CreateCompositionVariantBody(SchemeModel):
     )
 
 
+class FacetCount(SchemeModel):
+    value: str | int = Field(description="Значення фасету")
+    count: int = Field(description="Кількість творів з цим значенням")
+
+
+class CompositionFacets(SchemeModel):
+    genres: list[FacetCount] = Field(description="Кількість творів за жанрами (slug)")
+    styles: list[FacetCount] = Field(description="Кількість творів за стилями")
+    tags: list[FacetCount] = Field(description="Кількість творів за теґами")
+    years: list[FacetCount] = Field(description="Кількість творів за роками")
+
+
+class CompositionSuggestion(SchemeModel):
+    slug: str = Field(description="Слаґ твору")
+    title: str = Field(description="Назва твору")
+
+
+class CompositionBatchBody(SchemeModel):
+    keys: list[int | str] = Field(
+        min_length=1,
+        max_length=constants.COMPOSITION_BATCH_SIZE,
+        description="Ідентифікатори або слаґи творів",
+    )
+
+
+class CompositionBatch(SchemeModel):
+    items: list[Composition] = Field(description="Знайдені твори, в порядку запиту")
+    missing: list[int | str] = Field(description="Ідентифікатори та слаґи, яких не знайдено")
+
+
 class CompositionListBody(SchemeModel):
     genres: list[str] | None = Field(None, description="Перелік жанрів")
     genres_exclude: list[str] | None = Field(
@@ -30,6 +62,11 @@ class CompositionListBody(SchemeModel):
     volumes: tuple[int, int] | None = Field(None, description="Кількість томів. [Від, До]")
     chapters: tuple[int, int] | None = Field(None, description="Кількість розділів. [Від, До]")
 
+    sort: Literal["score", "scored_by", "variants", "year", "created_at", "title"] | None = Field(
+        None, description="Поле сортування. title - локалізована назва. null - за ідентифікатором"
+    )
+    order: Literal["asc", "desc"] = Field("asc", description="Порядок сортування")
+
     @field_validator("genres")
     def validate_genres(cls, v: list[str] | None) -> list[str] | None:
         if not v:
@@ -73,3 +110,10 @@ class CompositionListBody(SchemeModel):
             self.tags_exclude,
             self.genres_exclude,
         )
+
+
+class CompositionSearchBody(CompositionListBody):
+    query: str = Field(min_length=1, max_length=255, description="Пошуковий запит")
+
+    def cache_key(self) -> tuple:
+        return self.query, *super().cache_key()
@@ -1,12 +1,32 @@
+from typing import Sequence
+
 from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, Select, func, ScalarResult
+from sqlalchemy import select, Select, func, true, or_, text, Float, String, ScalarResult
+from sqlalchemy import Row, update, bindparam, union_all, literal, cast
 
-from src import constants
+from src import constants, scheme
+from src.util import keyset_paginate, count_rows
+from src.response_cache import purge_surrogate_keys
 from src.content_providers import ContentProviderComposition
-from .scheme import CreateCompositionVariantBody, CompositionListBody
+from .scheme import CreateCompositionVariantBody, CompositionListBody, CompositionSearchBody
 from src.models import Composition, UploadImage, CompositionVariant, User, Genre
 
+# Sort keys of composition list, id is appended as tiebreaker. Each pair has an index
+sort_keys = {
+    "score": Composition.score,
+    "scored_by": Composition.scored_by,
+    "variants": Composition.variants,
+    "year": Composition.sort_year,
+    "created_at": Composition.created_at,
+    "title": Composition.sort_title,
+}
+
+facet_names = ("genres", "styles", "tags", "years")
+
+# Whether pg_trgm is installed, checked on first search
+_trigram: dict[str, bool] = {}
+
 
 async def get_composition_by_slug(session: AsyncSession, slug: str) -> Composition:
     return await session.scalar(
@@ -77,23 +97,31 @@ async def publish_composition_variant(
 
     await session.commit()
 
+    await purge_surrogate_keys([f"composition:{origin.id}", f"variants:{origin.slug}"])
+
     return variant
 
 
+def genre_ids(slugs: list[str]):
+    """Array of ids of genres with given slugs"""
+    return func.array(select(Genre.id).filter(Genre.slug.in_(slugs)).scalar_subquery())
+
+
 def compositions_filters(query: Select, body: CompositionListBody):
     if body.genres is not None:
-        query = query.filter(*(Composition.genres.any(Genre.slug == slug) for slug in body.genres))
-
-    if body.genres_exclude is not None:
+        # Genre slugs are not unique, composition must have any of genres with each slug
         query = query.filter(
-            *(~Composition.genres.any(Genre.slug == slug) for slug in body.genres_exclude)
+            *(Composition.genre_ids.overlap(genre_ids([slug])) for slug in set(body.genres))
         )
 
+    if body.genres_exclude is not None:
+        query = query.filter(~Composition.genre_ids.overlap(genre_ids(body.genres_exclude)))
+
     if body.tags is not None:
-        query = query.filter(Composition.tags.op("@>")(body.tags))
+        query = query.filter(Composition.tags.contains(body.tags))
 
     if body.tags_exclude is not None:
-        query = query.filter(Composition.tags.op("<>")(body.tags_exclude))
+        query = query.filter(~Composition.tags.overlap(body.tags_exclude))
 
     if body.nsfw is not None:
         query = query.filter(Composition.nsfw == body.nsfw)
@@ -122,19 +150,285 @@ def compositions_filters(query: Select, body: CompositionListBody):
     return query
 
 
+def filters_cache_tags(body: CompositionListBody) -> list[str]:
+    """
+    Tags of results computed over compositions matching filters.
+
+    Composition can only match filters if it has one of filter genres (or style),
+    so results are tagged by the most selective of them
+    """
+    if body.genres:
+        return [f"genre:{slug}" for slug in body.genres]
+
+    if body.styles:
+        return [f"style:{style}" for style in body.styles]
+
+    return ["composition:*"]
+
+
+def composition_cache_tags(composition: Composition) -> list[str]:
+    """Tags of results that change when composition is published or updated"""
+    return [
+        "composition:*",
+        f"composition:{composition.id}",
+        f"style:{composition.style}",
+        *(f"genre:{genre.slug}" for genre in composition.genres),
+    ]
+
+
 def compositions_options(query: Select):
     return query.options(joinedload(Composition.preview), selectinload(Composition.genres))
 
 
-async def count_compositions(session: AsyncSession, body: CompositionListBody) -> int:
-    return await session.scalar(compositions_filters(select(func.count(Composition.id)), body))
+async def count_compositions(
+    session: AsyncSession, body: CompositionListBody, strategy: str
+) -> tuple[int, bool]:
+    return await count_rows(
+        session,
+        compositions_filters(select(Composition.id), body),
+        strategy,
+        constants.COUNT_ESTIMATE_THRESHOLD,
+    )
+
+
+def composition_keys(body: CompositionListBody) -> tuple:
+    """Keys compositions are ordered by, also keys of cursor pagination"""
+    if body.sort is None:
+        return (Composition.id,)
 
+    return sort_keys[body.sort], Composition.id
+
+
+def compositions_order(query: Select, body: CompositionListBody) -> Select:
+    keys = composition_keys(body)
+    return query.order_by(*(key.desc() if body.order == "desc" else key for key in keys))
+
+
+def render_card(composition: Composition) -> dict:
+    return scheme.Composition.model_validate(composition).model_dump(mode="json")
+
+
+async def refresh_cards(session: AsyncSession, ids: list[int]) -> dict[int, dict]:
+    """
+    Render cards of compositions with given ids and store them.
+
+    Card is stored only if composition wasn't updated while it was rendered
+    """
+    compositions = await session.scalars(
+        compositions_options(select(Composition).filter(Composition.id.in_(ids))).execution_options(
+            populate_existing=True
+        )
+    )
+
+    cards = {}
+    params = []
+    for composition in compositions:
+        cards[composition.id] = render_card(composition)
+        params.append(
+            {
+                "id_": composition.id,
+                "updated_at_": composition.updated_at,
+                "card": cards[composition.id],
+            }
+        )
+
+    if params:
+        table = Composition.__table__
+        connection = await session.connection()
+        await connection.execute(
+            update(table).where(
+                table.c.id == bindparam("id_"),
+                table.c.updated_at.is_not_distinct_from(bindparam("updated_at_")),
+            )
+            # Keep updated_at - card is not a change of composition
+            .values(card=bindparam("card"), updated_at=table.c.updated_at),
+            params,
+        )
+        await session.commit()
+
+    return cards
+
+
+async def fill_cards(session: AsyncSession, rows: Sequence[Row]) -> list[dict]:
+    """Cards of rows of composition id and card, stale cards are rendered"""
+    stale = [row.id for row in rows if row.card is None]
+    cards = await refresh_cards(session, stale) if stale else {}
+
+    # Composition may be deleted before its card is rendered
+    return [
+        row.card if row.card is not None else cards[row.id]
+        for row in rows
+        if row.card is not None or row.id in cards
+    ]
+
+
+async def get_composition_card(session: AsyncSession, slug: str) -> dict | None:
+    row = (
+        await session.execute(
+            select(Composition.id, Composition.card).filter(Composition.slug == slug).limit(1)
+        )
+    ).first()
+    if row is None:
+        return None
 
-async def list_compositions(
+    (card,) = await fill_cards(session, [row])
+    return card
+
+
+async def list_composition_cards(
     session: AsyncSession, body: CompositionListBody, offset: int, limit: int
+) -> list[dict]:
+    rows = await session.execute(
+        compositions_filters(
+            compositions_order(select(Composition.id, Composition.card), body)
+            .offset(offset)
+            .limit(limit),
+            body,
+        )
+    )
+
+    return await fill_cards(session, rows.all())
+
+
+async def get_composition_cards(session: AsyncSession, ids: list[int]) -> list[dict]:
+    """Cards of compositions with given ids, in order of ids"""
+    rows = {
+        row.id: row
+        for row in await session.execute(
+            select(Composition.id, Composition.card).filter(Composition.id.in_(ids))
+        )
+    }
+
+    return await fill_cards(session, [rows[id_] for id_ in ids if id_ in rows])
+
+
+async def get_composition_cards_by_keys(
+    session: AsyncSession, ids: list[int], slugs: list[str]
+) -> list[dict]:
+    rows = await session.execute(
+        select(Composition.id, Composition.card).filter(
+            or_(Composition.id.in_(ids), Composition.slug.in_(slugs))
+        )
+    )
+
+    return await fill_cards(session, rows.all())
+
+
+async def list_compositions_after(
+    session: AsyncSession, body: CompositionListBody, cursor: str, limit: int
 ) -> ScalarResult[Composition]:
     return await session.scalars(
         compositions_options(
-            compositions_filters(select(Composition).offset(offset).limit(limit), body)
+            compositions_filters(
+                keyset_paginate(
+                    select(Composition),
+                    composition_keys(body),
+                    cursor,
+                    limit,
+                    descending=body.order == "desc",
+                ),
+                body,
+            )
+        )
+    )
+
+
+async def count_facets(session: AsyncSession, body: CompositionListBody) -> dict[str, list[dict]]:
+    """
+    Count compositions matching filters per genre, style, tag and year in one pass.
+
+    Facets of each composition are stacked into one relation - a (facet, value) row per genre,
+    tag, style and year of composition, so rows are counted plainly
+    """
+    filtered = compositions_filters(
+        select(
+            Composition.id,
+            Composition.style,
+            Composition.year,
+            Composition.genre_ids,
+            Composition.tags,
+        ),
+        body,
+    ).cte("filtered")
+
+    genre_id = func.unnest(filtered.c.genre_ids).table_valued("id").render_derived().lateral()
+    tag = func.unnest(filtered.c.tags).table_valued("value").render_derived().lateral()
+
+    stacked = union_all(
+        # Genre slugs are not unique, composition is counted once per slug
+        select(literal("genres").label("facet"), Genre.slug.label("value"))
+        .select_from(filtered)
+        .join(genre_id, true())
+        .join(Genre, Genre.id == genre_id.c.id)
+        .group_by(filtered.c.id, Genre.slug),
+        select(literal("styles"), filtered.c.style),
+        select(literal("tags"), tag.c.value).select_from(filtered).join(tag, true()),
+        select(literal("years"), cast(filtered.c.year, String)).filter(
+            filtered.c.year.is_not(None)
+        ),
+    ).subquery()
+
+    rows = await session.execute(
+        select(stacked.c.facet, stacked.c.value, func.count()).group_by(
+            stacked.c.facet, stacked.c.value
+        )
+    )
+
+    facets = {name: [] for name in facet_names}
+    for facet, value, count in rows:
+        if facet == "years":
+            value = int(value)
+
+        facets[facet].append({"value": value, "count": count})
+
+    for items in facets.values():
+        items.sort(key=lambda item: (-item["count"], item["value"]))
+
+    return facets
+
+
+async def trigram_available(session: AsyncSession) -> bool:
+    """Whether pg_trgm extension is installed, it is optional for the search"""
+    if "available" not in _trigram:
+        _trigram["available"] = await session.scalar(
+            text("SELECT EXISTS(SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')")
+        )
+
+    return _trigram["available"]
+
+
+async def search_compositions(
+    session: AsyncSession, body: CompositionSearchBody, cursor: str, limit: int
+):
+    """
+    Search compositions by full-text document and, with pg_trgm, by similarity of titles.
+
+    Returns rows of composition, rank and id, ordered by rank
+    """
+    ts_query = func.websearch_to_tsquery("simple", body.query)
+
+    matches = [Composition.search_vector.op("@@")(ts_query)]
+    rank = func.ts_rank_cd(Composition.search_vector, ts_query)
+
+    if await trigram_available(session):
+        titles = (Composition.title_original, Composition.title_en, Composition.title_uk)
+        matches.extend(title.op("%")(body.query) for title in titles)
+        rank = rank + func.greatest(*(func.similarity(title, body.query) for title in titles))
+
+    ranked = compositions_filters(
+        select(Composition.id, rank.cast(Float).label("rank")).filter(or_(*matches)), body
+    ).subquery()
+
+    keys = (ranked.c.rank, ranked.c.id)
+
+    return keys, await session.execute(
+        compositions_options(
+            keyset_paginate(
+                select(Composition, *keys).join(ranked, ranked.c.id == Composition.id),
+                keys,
+                cursor,
+                limit,
+                descending=True,
+            )
         )
     )
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from . import service
@@ -6,9 +6,11 @@ from src import scheme
 from .scheme import CreateVolumeBody
 from src.permissions import permissions
 from src.database import acquire_session
+from src.response_cache import set_surrogate_keys
 from src.models import CompositionVariant
-from src.util import get_offset_and_limit, paginated_response
-from src.dependencies import require_page, require_permissions
+from src.util import get_offset_and_limit, paginated_response, cursor_response
+from src.util import check_not_modified, make_etag
+from src.dependencies import require_page, require_permissions, require_cursor
 from .dependencies import require_composition_variant, validate_create_volume
 
 router = APIRouter(prefix="/variant")
@@ -18,19 +20,34 @@ router = APIRouter(prefix="/variant")
     "/list/{slug}",
     summary="Отримати варіанти твору",
     operation_id="list_composition_variants",
-    response_model=scheme.Paginated[scheme.CompositionVariant],
+    response_model=(
+        scheme.Paginated[scheme.CompositionVariant]
+        | scheme.CursorPaginated[scheme.CompositionVariant]
+    ),
 )
 async def list_composition_variants(
     slug: str,
+    request: Request,
+    response: Response,
     page: int = Depends(require_page),
+    cursor: str | None = Depends(require_cursor),
     session: AsyncSession = Depends(acquire_session),
 ):
     offset, limit = get_offset_and_limit(page)
 
+    latest, size = await service.variants_version(session, slug)
+    check_not_modified(request, response, make_etag("variants", slug, latest, size), latest)
+
+    if cursor is not None:
+        items = (await service.list_variants_after(session, slug, cursor, limit)).all()
+        set_surrogate_keys(response, service.variants_surrogate_keys(slug, items))
+        return cursor_response(items, limit, service.variant_keys)
+
     total = await service.count_variants(session, slug)
-    items = await service.list_variants(session, slug, offset, limit)
+    items = (await service.list_variants(session, slug, offset, limit)).all()
+    set_surrogate_keys(response, service.variants_surrogate_keys(slug, items))
 
-    return paginated_response(items.all(), total, page, limit)
+    return paginated_response(items, total, page, limit)
 
 
 @router.get(
@@ -40,8 +57,23 @@ async def list_composition_variants(
     response_model=scheme.CompositionVariant,
 )
 async def get_composition_variant(
+    request: Request,
+    response: Response,
     variant: CompositionVariant = Depends(require_composition_variant),
 ):
+    set_surrogate_keys(response, service.variants_surrogate_keys(None, [variant]))
+
+    # Variant embeds its origin and author
+    versions = [
+        object_.updated_at or object_.created_at
+        for object_ in (variant, variant.origin, variant.author)
+    ]
+    check_not_modified(
+        request,
+        response,
+        make_etag("variant", variant.id, variant.volumes, variant.chapters, *versions),
+        max(versions),
+    )
     return variant
 
 
@@ -3,8 +3,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import Select, select, func, ScalarResult
 
 from .scheme import CreateVolumeBody
+from src.util import keyset_paginate, collection_version, last_modified
+from src.response_cache import purge_surrogate_keys
 from src.models import CompositionVariant, Composition, User, Volume
 
+# Keys of cursor pagination
+variant_keys = (CompositionVariant.id,)
+
 
 def variants_filter(query: Select, slug: str) -> Select:
     return query.filter(
@@ -28,6 +33,32 @@ def variants_options(query: Select) -> Select:
     )
 
 
+def variants_surrogate_keys(slug: str | None, variants: list[CompositionVariant]) -> list[str]:
+    """Keys of responses with variants, variants embed their origins and authors"""
+    keys = {f"variants:{slug}"} if slug is not None else set()
+    for variant in variants:
+        keys.update(
+            (
+                f"variant:{variant.id}",
+                f"composition:{variant.origin_id}",
+                f"user:{variant.author_id}",
+            )
+        )
+
+    return sorted(keys)
+
+
+async def variants_version(session: AsyncSession, slug: str):
+    """Version of variants of composition, including their origin and authors they embed"""
+    return await collection_version(
+        session,
+        variants_filter(select(CompositionVariant), slug).filter(
+            User.id == CompositionVariant.author_id
+        ),
+        last_modified(CompositionVariant, Composition, User),
+    )
+
+
 async def count_variants(session: AsyncSession, slug: str) -> int:
     return await session.scalar(select(Composition.variants).filter(Composition.slug == slug)) or 0
 
@@ -42,6 +73,18 @@ async def list_variants(
     )
 
 
+async def list_variants_after(
+    session: AsyncSession, slug: str, cursor: str, limit: int
+) -> ScalarResult[CompositionVariant]:
+    return await session.scalars(
+        variants_options(
+            variants_filter(
+                keyset_paginate(select(CompositionVariant), variant_keys, cursor, limit), slug
+            )
+        )
+    )
+
+
 async def create_volume(
     session: AsyncSession, variant: CompositionVariant, body: CreateVolumeBody
 ) -> Volume:
@@ -56,4 +99,6 @@ async def create_volume(
 
     await session.commit()
 
+    await purge_surrogate_keys([f"variant:{variant.id}"])
+
     return volume
@@ -0,0 +1,29 @@
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import service
+from src.database import acquire_session
+from src.single_flight import single_flight
+from src.scheme import define_error_category
+from src.dependencies import require_page, require_cursor
+
+define_error = define_error_category("content/chapter")
+chapter_not_found = define_error("not-found", "Chapter not found", 404)
+
+
+@chapter_not_found.mark
+async def require_pages_listing(
+    chapter_id: int,
+    page: int = Depends(require_page),
+    cursor: str | None = Depends(require_cursor),
+    session: AsyncSession = Depends(acquire_session),
+) -> dict:
+    # Chapter, version and pages are loaded once for a burst of identical requests
+    listing = await single_flight.run(
+        ("pages", chapter_id, page, cursor),
+        service.get_pages_listing(session, chapter_id, page, cursor),
+    )
+    if listing is None:
+        raise chapter_not_found
+
+    return listing
@@ -1,43 +1,38 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Request, Response
 
-from . import service
-from src import scheme, constants
-from src.database import acquire_session
-from src.models import Chapter, TextPage, ImagePage
-from src.dependencies import require_chapter, require_page, require_content_page
-from src.util import get_offset_and_limit, paginated_response
-from src.service import get_composition_variant_by_chapter_id
+from src import scheme
+from src.models import TextPage, ImagePage
+from src.util import check_not_modified, make_etag
+from .dependencies import require_pages_listing
+from src.response_cache import set_surrogate_keys
+from src.dependencies import require_content_page
 
 router = APIRouter(prefix="/page")
 
 
-IMAGE_TYPE_TO_MODEL = {
-    constants.PAGE_TEXT: TextPage,
-    constants.PAGE_IMAGE: ImagePage,
-}
-
-
 @router.get(
     "/list/{chapter_id}",
     summary="Отримати сторінки розділу",
     operation_id="list_pages",
-    response_model=scheme.Paginated[scheme.ImagePage] | scheme.Paginated[scheme.TextPage],
+    response_model=(
+        scheme.Paginated[scheme.ImagePage]
+        | scheme.Paginated[scheme.TextPage]
+        | scheme.CursorPaginated[scheme.ImagePage]
+        | scheme.CursorPaginated[scheme.TextPage]
+    ),
 )
 async def list_pages(
-    page: int = Depends(require_page),
-    chapter: Chapter = Depends(require_chapter),
-    session: AsyncSession = Depends(acquire_session),
+    request: Request,
+    response: Response,
+    chapter_id: int,
+    listing: dict = Depends(require_pages_listing),
 ):
-    offset, limit = get_offset_and_limit(page)
-
-    variant = await get_composition_variant_by_chapter_id(session, chapter.id)
+    set_surrogate_keys(response, [f"chapter:{chapter_id}"])
 
-    model = IMAGE_TYPE_TO_MODEL[constants.COMPOSITION_STYLE_TO_PAGE_TYPE[variant.origin.style]]
+    latest, size = listing["latest"], listing["size"]
+    check_not_modified(request, response, make_etag("pages", chapter_id, latest, size), latest)
 
-    items = await service.list_pages(session, chapter.id, offset, limit, model)
-
-    return paginated_response(items.all(), chapter.pages, page, limit)
+    return listing["body"]
 
 
 @router.get(
@@ -46,5 +41,16 @@ async def list_pages(
     operation_id="get_page",
     response_model=scheme.TextPage | scheme.ImagePage,
 )
-async def get_page(page: ImagePage | TextPage = Depends(require_content_page)):
+async def get_page(
+    request: Request,
+    response: Response,
+    page: ImagePage | TextPage = Depends(require_content_page),
+):
+    set_surrogate_keys(response, [f"page:{page.id}"])
+    check_not_modified(
+        request,
+        response,
+        make_etag("page", page.id, page.updated_at),
+        page.updated_at or page.created_at,
+    )
     return page
@@ -2,7 +2,16 @@ from sqlalchemy import Select, select, ScalarResult
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
+from src import scheme, constants
 from src.models import BasePage, TextPage, ImagePage
+from src.util import keyset_paginate, collection_version, last_modified
+from src.util import get_offset_and_limit, paginated_response, cursor_response
+from src.service import get_chapter, get_composition_variant_by_chapter_id, IMAGE_TYPE_TO_MODEL
+
+MODEL_TO_SCHEME = {
+    TextPage: scheme.TextPage,
+    ImagePage: scheme.ImagePage,
+}
 
 
 def page_filters(query: Select, chapter_id: int):
@@ -15,6 +24,12 @@ def page_options(query: Select, model: type[TextPage | ImagePage]):
     return query
 
 
+async def pages_version(session: AsyncSession, chapter_id: int):
+    return await collection_version(
+        session, page_filters(select(BasePage), chapter_id), last_modified(BasePage)
+    )
+
+
 async def list_pages(
     session: AsyncSession,
     chapter_id: int,
@@ -28,3 +43,57 @@ async def list_pages(
             chapter_id,
         )
     )
+
+
+def page_keys(model: type[TextPage | ImagePage]):
+    """Keys of cursor pagination"""
+    return model.index, model.id
+
+
+async def list_pages_after(
+    session: AsyncSession,
+    chapter_id: int,
+    cursor: str,
+    limit: int,
+    model: type[TextPage | ImagePage],
+) -> ScalarResult[TextPage | ImagePage]:
+    return await session.scalars(
+        page_filters(
+            page_options(keyset_paginate(select(model), page_keys(model), cursor, limit), model),
+            chapter_id,
+        )
+    )
+
+
+async def get_pages_listing(
+    session: AsyncSession, chapter_id: int, page: int, cursor: str | None
+) -> dict | None:
+    """
+    Chapter pages serialized together with version of the collection.
+    Return None if chapter doesn't exist.
+
+    Result holds no ORM instances, so it can be shared by concurrent requests
+    """
+    chapter = await get_chapter(session, chapter_id)
+    if chapter is None:
+        return None
+
+    latest, size = await pages_version(session, chapter_id)
+
+    variant = await get_composition_variant_by_chapter_id(session, chapter_id)
+    model = IMAGE_TYPE_TO_MODEL[constants.COMPOSITION_STYLE_TO_PAGE_TYPE[variant.origin.style]]
+
+    offset, limit = get_offset_and_limit(page)
+
+    if cursor is not None:
+        items = await list_pages_after(session, chapter_id, cursor, limit, model)
+        body = scheme.CursorPaginated[MODEL_TO_SCHEME[model]].model_validate(
+            cursor_response(items.all(), limit, page_keys(model))
+        )
+    else:
+        items = await list_pages(session, chapter_id, offset, limit, model)
+        body = scheme.Paginated[MODEL_TO_SCHEME[model]].model_validate(
+            paginated_response(items.all(), chapter.pages, page, limit)
+        )
+
+    return {"latest": latest, "size": size, "body": body.model_dump(mode="json")}
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from . import service
@@ -6,12 +6,15 @@ from src import scheme
 from .scheme import CreateChapterBody
 from src.permissions import permissions
 from src.database import acquire_session
+from src.response_cache import set_surrogate_keys
 from .dependencies import validate_create_chapter
 from src.models import CompositionVariant, Volume
-from src.util import get_offset_and_limit, paginated_response
+from src.util import get_offset_and_limit, paginated_response, cursor_response
+from src.util import check_not_modified, make_etag
 
 from src.dependencies import (
     require_page,
+    require_cursor,
     require_volume,
     require_permissions,
     require_composition_variant,
@@ -24,15 +27,27 @@ router = APIRouter(prefix="/volume")
     "/list/{variant_id}",
     summary="Отримати томи варіанту твору",
     operation_id="list_volumes",
-    response_model=scheme.Paginated[scheme.Volume],
+    response_model=scheme.Paginated[scheme.Volume] | scheme.CursorPaginated[scheme.Volume],
 )
 async def list_volumes(
+    request: Request,
+    response: Response,
     page: int = Depends(require_page),
+    cursor: str | None = Depends(require_cursor),
     variant: CompositionVariant = Depends(require_composition_variant),
     session: AsyncSession = Depends(acquire_session),
 ):
     offset, limit = get_offset_and_limit(page)
 
+    set_surrogate_keys(response, [f"variant:{variant.id}"])
+
+    latest, size = await service.volumes_version(session, variant.id)
+    check_not_modified(request, response, make_etag("volumes", variant.id, latest, size), latest)
+
+    if cursor is not None:
+        items = await service.list_volumes_after(session, variant.id, cursor, limit)
+        return cursor_response(items.all(), limit, service.volume_keys)
+
     items = await service.list_volumes(session, variant.id, offset, limit)
 
     return paginated_response(items.all(), variant.volumes, page, limit)
@@ -44,7 +59,16 @@ async def list_volumes(
     operation_id="get_volume",
     response_model=scheme.Volume,
 )
-async def get_volume(volume: Volume = Depends(require_volume)):
+async def get_volume(
+    request: Request, response: Response, volume: Volume = Depends(require_volume)
+):
+    set_surrogate_keys(response, [f"volume:{volume.id}"])
+    check_not_modified(
+        request,
+        response,
+        make_etag("volume", volume.id, volume.updated_at, volume.chapters),
+        volume.updated_at or volume.created_at,
+    )
     return volume
 
 
@@ -1,8 +1,13 @@
 from sqlalchemy import Select, select, func, ScalarResult
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.util import keyset_paginate, collection_version, last_modified
+from src.response_cache import purge_surrogate_keys
 from src.models import Volume, Chapter
 
+# Keys of cursor pagination
+volume_keys = (Volume.index, Volume.id)
+
 
 def volume_filters(query: Select, variant_id: int):
     return query.filter(Volume.variant_id == variant_id)
@@ -12,6 +17,12 @@ def volume_options(query: Select):
     return query
 
 
+async def volumes_version(session: AsyncSession, variant_id: int):
+    return await collection_version(
+        session, volume_filters(select(Volume), variant_id), last_modified(Volume)
+    )
+
+
 async def list_volumes(
     session: AsyncSession, variant_id: int, offset: int, limit: int
 ) -> ScalarResult[Volume]:
@@ -23,6 +34,17 @@ async def list_volumes(
     )
 
 
+async def list_volumes_after(
+    session: AsyncSession, variant_id: int, cursor: str, limit: int
+) -> ScalarResult[Volume]:
+    return await session.scalars(
+        volume_filters(
+            volume_options(keyset_paginate(select(Volume), volume_keys, cursor, limit)),
+            variant_id,
+        )
+    )
+
+
 async def create_chapter(session: AsyncSession, volume: Volume, body):
     chapter = Chapter(
         volume=volume,
@@ -34,4 +56,6 @@ async def create_chapter(session: AsyncSession, volume: Volume, body):
 
     await session.commit()
 
+    await purge_surrogate_keys([f"volume:{volume.id}", f"variant:{volume.variant_id}"])
+
     return chapter
@@ -6,8 +6,8 @@ from src import util
 from src.models import Role
 from src.routes.roles import service
 from src.database import acquire_session
-from src.dependencies import require_page, master_lock
-from .scheme import CreateRoleBody, UpdateRoleBody, FullRole, Paginated
+from src.dependencies import require_page, master_lock, require_cursor
+from .scheme import CreateRoleBody, UpdateRoleBody, FullRole, Paginated, CursorPaginated
 
 from .dependencies import (
     validate_role,
@@ -19,13 +19,22 @@ from .dependencies import (
 router = fastapi.APIRouter(prefix="/roles", tags=["Ролі"])
 
 
-@router.get("", response_model=Paginated[FullRole], operation_id="get_roles")
+@router.get(
+    "",
+    response_model=Paginated[FullRole] | CursorPaginated[FullRole],
+    operation_id="get_roles",
+)
 async def get_roles(
     page: int = Depends(require_page),
+    cursor: str | None = Depends(require_cursor),
     session: AsyncSession = Depends(acquire_session),
 ):
     offset, limit = util.get_offset_and_limit(page)
 
+    if cursor is not None:
+        items = await service.list_roles_after(session, cursor, limit)
+        return util.cursor_response(items.all(), limit, service.role_keys)
+
     total = await service.count_roles(session)
     items = await service.list_roles(session, offset=offset, limit=limit)
 
@@ -4,7 +4,7 @@ from operator import contains
 from pydantic import Field, field_validator
 
 from src import scheme
-from src.scheme import Paginated
+from src.scheme import Paginated, CursorPaginated
 from src.scheme.model import SchemeModel
 from src.permissions import permission_registry
 
@@ -12,6 +12,7 @@ from src.permissions import permission_registry
 __all__ = [
     "FullRole",
     "Paginated",
+    "CursorPaginated",
     "CreateRoleBody",
     "UpdateRoleBody",
 ]
@@ -2,20 +2,27 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, ScalarResult, update
 
 from src.models import Role, User
+from src.util import keyset_paginate
 from src.service import get_role_by_name
+from src.token_cache import token_cache
 from src.routes.roles.scheme import CreateRoleBody, UpdateRoleBody
 
 
 __all__ = [
     "has_users",
+    "role_keys",
     "list_roles",
     "create_role",
     "update_role",
     "count_roles",
     "delete_role",
+    "list_roles_after",
     "get_role_by_name",
 ]
 
+# Keys of cursor pagination
+role_keys = (Role.created_at, Role.id)
+
 
 async def has_users(session: AsyncSession, name: str) -> bool:
     return not not await session.scalar(
@@ -55,6 +62,12 @@ async def list_roles(session: AsyncSession, offset: int, limit: int) -> ScalarRe
     )
 
 
+async def list_roles_after(session: AsyncSession, cursor: str, limit: int) -> ScalarResult[Role]:
+    return await session.scalars(
+        keyset_paginate(select(Role), role_keys, cursor, limit, descending=True)
+    )
+
+
 async def update_role(session: AsyncSession, body: UpdateRoleBody, role: Role):
     if body.title is not None:
         role.title = body.title
@@ -71,7 +84,11 @@ async def update_role(session: AsyncSession, body: UpdateRoleBody, role: Role):
     if body.weight is not None:
         role.weight = body.weight
 
+    role.version = Role.version + 1
+
     await session.commit()
+    await session.refresh(role, ["version"])
+    await token_cache.drop_role(role.id)
 
     return role
 
@@ -84,4 +101,6 @@ async def delete_role(session: AsyncSession, role: Role, replacement_role: Role)
 
     await session.delete(role)
     await session.commit()
+    await token_cache.drop_role(role.id)
+    User.forget_role_permissions(role.id)
     return role
@@ -1,13 +1,13 @@
 from fastapi import APIRouter, Depends, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src import scheme
+from src import scheme, util
 from src.routes.users import service
 from src.permissions import permissions
 from src.models import Token, User, Role
 from src.database import acquire_session
-from .scheme import UpdateUserBody, UpdateOtherUserBody
-from src.dependencies import require_token, require_permissions, optional_token
+from .scheme import UpdateUserBody, UpdateOtherUserBody, OnlineCount
+from src.dependencies import require_token, require_permissions, optional_token, require_page
 
 from .dependencies import (
     file_mime,
@@ -67,6 +67,34 @@ async def update_me_avatar(
     return await service.update_user_avatar(session, token.owner, file, mime)
 
 
+@router.get(
+    "/online/count",
+    response_model=OnlineCount,
+    summary="Кількість користувачів онлайн",
+    operation_id="count_online_users",
+)
+async def count_online_users():
+    return {"count": await service.count_online_users()}
+
+
+@router.get(
+    "/online/list",
+    response_model=scheme.Paginated[scheme.User],
+    summary="Користувачі онлайн",
+    operation_id="list_online_users",
+)
+async def list_online_users(
+    page: int = Depends(require_page),
+    session: AsyncSession = Depends(acquire_session),
+):
+    offset, limit = util.get_offset_and_limit(page)
+
+    total = await service.count_online_users()
+    items = await service.list_online_users(session, offset, limit)
+
+    return util.paginated_response(items, total, page, limit)
+
+
 @router.get(
     "/{nickname}",
     response_model=scheme.User,
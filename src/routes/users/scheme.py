@@ -9,6 +9,10 @@ from src.scheme.model import SchemeModel
 from src.permissions import permissions, permission_registry
 
 
+class OnlineCount(SchemeModel):
+    count: int = Field(description="Amount of users online")
+
+
 class UpdateUserBody(SchemeModel):
     nickname: str | None = Field(None, description="User's nickname")
     pseudonym: str | None = Field(None, description="User's pseudonym")
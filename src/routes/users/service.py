@@ -3,11 +3,16 @@ import mimetypes
 
 from PIL import Image
 from fastapi import UploadFile
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from config import settings
 from src import constants, util
 from src.scheme.error import APIError
+from src.presence import presence
+from src.token_cache import token_cache
+from src.response_cache import purge_surrogate_keys
 from src.models import User, UploadImage, Role
 from .scheme import UpdateUserBody, UpdateOtherUserBody
 
@@ -59,6 +64,8 @@ async def update_user(
             user.local_permissions = body.permissions
 
     await session.commit()
+    await token_cache.drop_user(user.id)
+    await purge_surrogate_keys([f"user:{user.id}"])
 
     return user
 
@@ -117,6 +124,8 @@ async def update_user_avatar(
     user.avatar = avatar
 
     await session.commit()
+    await token_cache.drop_user(user.id)
+    await purge_surrogate_keys([f"user:{user.id}"])
 
     return user
 
@@ -125,5 +134,25 @@ async def update_user_role(session: AsyncSession, user: User, role: Role) -> Use
     user.role = role
 
     await session.commit()
+    await token_cache.drop_user(user.id)
+    await purge_surrogate_keys([f"user:{user.id}"])
 
     return user
+
+
+async def count_online_users() -> int:
+    return await presence.count()
+
+
+async def list_online_users(session: AsyncSession, offset: int, limit: int) -> list[User]:
+    """Online users, recently seen first"""
+    ids = await presence.list(offset, limit)
+
+    users = await session.scalars(
+        select(User)
+        .filter(User.id.in_(ids))
+        .options(joinedload(User.avatar), joinedload(User.role))
+    )
+    users_by_id = {user.id: user for user in users}
+
+    return [users_by_id[id_] for id_ in ids if id_ in users_by_id]
@@ -17,6 +17,7 @@ from .model import SchemeModel
 from .image import UploadImage
 from .error import define_error
 from .pagination import Paginated
+from .pagination import CursorPaginated
 from .providers import OAuthProvider
 from .composition import Composition
 from .providers import ContentProvider
@@ -46,6 +47,7 @@ __all__ = [
     "Composition",
     "define_error",
     "OAuthProvider",
+    "CursorPaginated",
     "ContentProvider",
     "CompositionVariant",
     "ValidationErrorModel",
@@ -1,15 +1,19 @@
 from typing import TypeVar, Generic
 
+from pydantic import Field
+
 from .model import SchemeModel
 
 
-__all__ = ["Paginated"]
+__all__ = ["Paginated", "CursorPaginated"]
 
 
 class PaginationData(SchemeModel):
     total: int
     pages: int
     page: int
+    # False if total is estimated
+    exact: bool = True
 
 
 T = TypeVar("T", bound=SchemeModel)
@@ -18,3 +22,8 @@ T = TypeVar("T", bound=SchemeModel)
 class Paginated(SchemeModel, Generic[T]):
     pagination: PaginationData
     items: list[T]
+
+
+class CursorPaginated(SchemeModel, Generic[T]):
+    next: str | None = Field(description="Курсор наступної сторінки, null - це остання сторінка")
+    items: list[T]
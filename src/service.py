@@ -1,12 +1,15 @@
+import time
 from datetime import timedelta
 from typing import Any
 
-from sqlalchemy import select, delete, func, update
+from sqlalchemy import select, delete, func, update, values, column, BigInteger, DateTime
 from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.util import now
+from src.presence import presence
+from src.util import now, token_digest, from_utc_timestamp, metric
 from src import constants
+from src.token_cache import token_cache
 from src.models import (
     Role,
     User,
@@ -27,20 +30,112 @@ IMAGE_TYPE_TO_MODEL = {
 }
 
 
-async def get_token(session: AsyncSession, body: str) -> Token | None:
-    return await session.scalar(
+async def get_token(session: AsyncSession, body: str | None) -> Token | None:
+    if body is None:
+        return None
+
+    token = await session.scalar(
         select(Token)
-        .filter_by(body=body)
+        .filter_by(digest=token_digest(body))
         .options(
             joinedload(Token.owner).options(joinedload(User.avatar), joinedload(User.role)),
         )
     )
 
+    if token is not None:
+        token.body = body
+
+    return token
+
+
+async def get_cached_token(session: AsyncSession, body: str | None) -> Token | None:
+    """Resolve token using token cache, fallback to database"""
+    if body is None:
+        return None
+
+    data = await token_cache.get(body)
+    if data is not None:
+        token = await token_cache.restore(session, data)
+        token.body = body
+        return token
+
+    token = await get_token(session, body)
+    if token is not None:
+        await token_cache.set(body, token)
+
+    return token
+
 
-async def drop_expired_tokens(session: AsyncSession, shift: timedelta = timedelta(days=2)) -> None:
-    await session.execute(delete(Token).filter(Token.expire_at <= (now() - abs(shift))))
+async def drop_expired_tokens(
+    session: AsyncSession,
+    shift: timedelta = timedelta(days=2),
+    batch_size: int = constants.TOKEN_SWEEP_BATCH_SIZE,
+    time_budget: float = constants.TOKEN_SWEEP_TIME_BUDGET,
+) -> int:
+    """
+    Delete expired tokens in batches, each batch in its own transaction.
+
+    Stops when there are no more expired tokens or time budget is exhausted,
+    the rest is left for the next run. Returns amount of deleted tokens
+    """
+    border = now() - abs(shift)
+    deadline = time.monotonic() + time_budget
+    start = time.perf_counter()
+
+    deleted = 0
+    while True:
+        batch = (
+            select(Token.id)
+            .filter(Token.expire_at <= border)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await session.execute(
+            delete(Token)
+            .filter(Token.id.in_(batch.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+
+        deleted += result.rowcount
+        metric("token_sweep.batch.size").observe(result.rowcount)
+
+        if result.rowcount < batch_size or time.monotonic() >= deadline:
+            break
+
+    metric("token_sweep.deleted").observe(deleted)
+    metric("token_sweep.latency").observe(time.perf_counter() - start)
+
+    return deleted
+
+
+async def sync_presence(session: AsyncSession) -> int:
+    """Write presence of online users to ``next_offline`` column in bulk"""
+    seen = await presence.snapshot()
+    if not seen:
+        return 0
+
+    ttl = timedelta(seconds=constants.USER_ONLINE_TTL)
+    online = values(
+        column("id", BigInteger),
+        column("next_offline", DateTime),
+        name="online",
+    ).data([(user_id, from_utc_timestamp(seen_at) + ttl) for user_id, seen_at in seen.items()])
+
+    await session.execute(
+        update(User)
+        .where(User.id == online.c.id)
+        .values(
+            next_offline=func.greatest(User.next_offline, online.c.next_offline),
+            # Presence is not a change of user's data
+            updated_at=User.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
     await session.commit()
 
+    return len(seen)
+
 
 async def get_default_role(session: AsyncSession) -> Role | None:
     return await session.scalar(select(Role).filter(Role.default))
@@ -0,0 +1,75 @@
+from redis.asyncio import Redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from src import constants
+from src.models import User
+from src.util import LRUCache, TokenClaims, verify_signed_token
+
+__all__ = ["signed_tokens_enabled", "token_key", "verify_token", "token_generations"]
+
+
+def signed_tokens_enabled() -> bool:
+    return settings.tokens.mode == "signed"
+
+
+def token_key() -> bytes:
+    return settings.service.token_key.encode()
+
+
+def verify_token(body: str) -> TokenClaims | None:
+    return verify_signed_token(token_key(), body)
+
+
+class TokenGenerations:
+    """
+    Per-user token generation counters used to revoke signed tokens.
+
+    Signed token is valid only while its generation equals current generation of its owner.
+    Database is the source of truth, counters are cached in worker's memory and in redis.
+    """
+
+    prefix = "token-generation"
+
+    def __init__(self, maxsize: int, local_ttl: float, ttl: int):
+        self.local: LRUCache[int, int] = LRUCache(maxsize, local_ttl)
+        self.ttl = ttl
+        self.redis: Redis | None = None
+
+    def setup(self, redis: Redis | None):
+        self.redis = redis
+
+    def clear(self):
+        self.local.clear()
+
+    async def get(self, session: AsyncSession, user_id: int) -> int | None:
+        generation = self.local.get(user_id)
+        if generation is not None:
+            return generation
+
+        if self.redis is not None:
+            raw = await self.redis.get(f"{self.prefix}:{user_id}")
+            if raw is not None:
+                generation = int(raw)
+                self.local.set(user_id, generation)
+                return generation
+
+        generation = await session.scalar(select(User.token_generation).filter_by(id=user_id))
+        if generation is not None:
+            await self.set(user_id, generation)
+
+        return generation
+
+    async def set(self, user_id: int, generation: int) -> None:
+        self.local.set(user_id, generation)
+
+        if self.redis is not None:
+            await self.redis.set(f"{self.prefix}:{user_id}", generation, ex=self.ttl)
+
+
+token_generations = TokenGenerations(
+    constants.TOKEN_CACHE_SIZE,
+    constants.TOKEN_CACHE_LOCAL_TTL,
+    constants.TOKEN_TTL,
+)
@@ -0,0 +1,122 @@
+import time
+import asyncio
+import secrets
+import contextlib
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable, TypeVar
+
+from redis.asyncio import Redis
+
+from src import constants
+from src.util import metric
+
+T = TypeVar("T")
+
+# Delete lock only if it is still held by this worker
+_release_script = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent loads.
+
+    Within worker, loads with the same key share one in-flight future - the first caller
+    runs the load, others await its result. Across workers loads can be coalesced with
+    redis lock (see ``lock``), as long as result is published somewhere others can wait for it
+
+    :param lock_ttl: time after which lock of crashed worker is released, in seconds
+    :param wait_timeout: time to wait for result of other worker before loading it anyway
+    :param poll_interval: interval of checking whether result of other worker is ready
+    """
+
+    prefix = "single-flight"
+
+    def __init__(self, lock_ttl: float, wait_timeout: float, poll_interval: float):
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+
+        self.redis: Redis | None = None
+        self.futures: dict[Hashable, asyncio.Future] = {}
+
+    def setup(self, redis: Redis | None) -> None:
+        self.redis = redis
+
+    async def run(self, key: Hashable, coro: Awaitable[T]) -> T:
+        """Await coroutine, or result of in-flight coroutine with the same key"""
+        future = self.futures.get(key)
+        if future is not None:
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Caller is cancelled, not the load
+                if not future.cancelled():
+                    raise
+            else:
+                if asyncio.iscoroutine(coro):
+                    coro.close()
+
+                metric("single_flight.coalesced").observe()
+                return result
+
+        future = asyncio.get_running_loop().create_future()
+        # Followers may be absent, don't report exception as never retrieved
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self.futures[key] = future
+
+        try:
+            result = await coro
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self.futures.get(key) is future:
+                del self.futures[key]
+
+    @contextlib.asynccontextmanager
+    async def lock(self, key: str) -> AsyncIterator[bool]:
+        """Try to take cross-worker lock of the key. Yields whether lock is taken"""
+        if self.redis is None:
+            yield True
+            return
+
+        name = f"{self.prefix}:{key}"
+        token = secrets.token_hex(8)
+
+        acquired = await self.redis.set(name, token, nx=True, px=int(self.lock_ttl * 1000))
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                await self.redis.eval(_release_script, 1, name, token)
+
+    async def wait(self, check: Callable[[], Awaitable[Any]], missing: Any = None) -> Any:
+        """Poll check until it returns something other than missing, or wait timeout is out"""
+        deadline = time.monotonic() + self.wait_timeout
+
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+
+            result = await check()
+            if result is not missing:
+                metric("single_flight.waited").observe()
+                return result
+
+        return missing
+
+
+single_flight = SingleFlight(
+    constants.SINGLE_FLIGHT_LOCK_TTL,
+    constants.SINGLE_FLIGHT_WAIT_TIMEOUT,
+    constants.SINGLE_FLIGHT_POLL_INTERVAL,
+)
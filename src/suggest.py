@@ -0,0 +1,178 @@
+import re
+import time
+import asyncio
+import logging
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src import constants
+from src.util import metric
+from src.models import Composition
+from src.database import session_holder
+
+logger = logging.getLogger(__name__)
+
+_word = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    return " ".join(_word.findall(text.casefold()))
+
+
+class SuggestIndex:
+    """
+    In-memory prefix index over composition titles and slugs.
+
+    Titles are indexed from the start of every word, so "trig" finds "World Trigger".
+    Keys are normalized, cut to ``key_length`` characters and kept in sorted array - lookup is
+    a binary search. Compositions published by this worker are added right away, ones published
+    by other workers are picked up by periodic refresh.
+
+    Refresh follows creation time of compositions, not ids - ids are taken before transaction
+    commits, so composition with lower id may become visible after higher one was indexed.
+    Each refresh re-reads compositions created within ``overlap`` before the newest indexed one
+    """
+
+    def __init__(self, key_length: int, max_entries: int, overlap: float):
+        self.key_length = key_length
+        self.max_entries = max_entries
+        self.overlap = timedelta(seconds=overlap)
+        self.interval: float | None = None
+
+        # (key, composition id), sorted
+        self.entries: list[tuple[str, int]] = []
+        # composition id -> (slug, title)
+        self.compositions: dict[int, tuple[str, str]] = {}
+        # Creation time of the newest indexed composition
+        self.last_created_at: datetime | None = None
+
+        self._task: asyncio.Task | None = None
+
+    def setup(self, interval: float | None = None) -> None:
+        self.interval = interval
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.compositions.clear()
+        self.last_created_at = None
+
+    def start(self) -> None:
+        if self.interval is not None and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+
+            try:
+                async with session_holder.session() as session:
+                    await self.refresh(session)
+            except Exception:  # noqa
+                logger.exception("Suggest index refresh failed")
+
+    def _keys(self, slug: str, titles: Iterable[str | None]) -> set[str]:
+        keys = {normalize(slug)[: self.key_length]}
+
+        for title in titles:
+            if not title:
+                continue
+
+            title = normalize(title)
+            for word in _word.finditer(title):
+                keys.add(title[word.start() :][: self.key_length])
+
+        return keys
+
+    def _index(self, id_: int, slug: str, title: str, titles: Iterable[str | None]) -> list:
+        if id_ in self.compositions:
+            return []
+
+        if len(self.entries) >= self.max_entries:
+            logger.warning("Suggest index is full, composition %s is not indexed", id_)
+            return []
+
+        self.compositions[id_] = (slug, title)
+        return [(key, id_) for key in self._keys(slug, titles)]
+
+    def add(self, composition: Composition) -> None:
+        """Index just published composition"""
+        entries = self._index(
+            composition.id,
+            composition.slug,
+            composition.title,
+            (composition.title_original, composition.title_en, composition.title_uk),
+        )
+
+        self.entries.extend(entries)
+        self.entries.sort()
+
+    async def refresh(self, session: AsyncSession) -> None:
+        """Index compositions published since last refresh, streaming them from database"""
+        start = time.perf_counter()
+
+        query = select(
+            Composition.id,
+            Composition.created_at,
+            Composition.slug,
+            Composition.title_original,
+            Composition.title_en,
+            Composition.title_uk,
+        )
+
+        if self.last_created_at is not None:
+            query = query.filter(Composition.created_at >= self.last_created_at - self.overlap)
+
+        rows = await session.stream(
+            query.order_by(Composition.created_at).execution_options(yield_per=1000)
+        )
+
+        entries = []
+        async for id_, created_at, slug, *titles in rows:
+            title_original, title_en, title_uk = titles
+            title = title_uk or title_en or title_original
+
+            # Already indexed compositions of overlap are skipped
+            entries.extend(self._index(id_, slug, title, titles))
+            self.last_created_at = max(created_at, self.last_created_at or created_at)
+
+        if entries:
+            # Both parts are sorted runs, so sorting is linear
+            self.entries.extend(sorted(entries))
+            self.entries.sort()
+
+        metric("suggest.refresh.size").observe(len(entries))
+        metric("suggest.refresh.latency").observe(time.perf_counter() - start)
+
+    def suggest(self, query: str, limit: int) -> list[dict[str, str]]:
+        """Compositions which title or slug has word starting with query"""
+        query = normalize(query)[: self.key_length]
+        if not query:
+            return []
+
+        found = {}
+        index = bisect_left(self.entries, (query,))
+        while index < len(self.entries) and len(found) < limit:
+            key, id_ = self.entries[index]
+            if not key.startswith(query):
+                break
+
+            found.setdefault(id_, None)
+            index += 1
+
+        return [
+            {"slug": self.compositions[id_][0], "title": self.compositions[id_][1]} for id_ in found
+        ]
+
+
+suggest_index = SuggestIndex(
+    constants.SUGGEST_KEY_LENGTH, constants.SUGGEST_MAX_ENTRIES, constants.SUGGEST_REFRESH_OVERLAP
+)
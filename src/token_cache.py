@@ -0,0 +1,130 @@
+import json
+from typing import Any
+
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from src import constants
+from src.util import LRUCache, dump_columns, load_detached, token_digest
+from src.models import Token, User, Role, UploadImage
+
+
+class TokenCache:
+    """
+    Two-tier cache of resolved tokens (token -> owner -> avatar, role).
+
+    Local tier is a bounded LRU with short TTL that lives in worker's memory,
+    shared tier lives in redis and is used by all workers.
+    Entries are keyed by sha256 of token body, so plain tokens never leave the worker.
+    """
+
+    prefix = "token-cache"
+
+    def __init__(self, maxsize: int, local_ttl: float, ttl: int):
+        self.local: LRUCache[str, dict[str, Any]] = LRUCache(maxsize, local_ttl)
+        self.ttl = ttl
+        self.redis: Redis | None = None
+
+    def setup(self, redis: Redis | None):
+        self.redis = redis
+
+    def clear(self):
+        self.local.clear()
+
+    @staticmethod
+    def key(body: str) -> str:
+        return token_digest(body).hex()
+
+    async def get(self, body: str) -> dict[str, Any] | None:
+        key = self.key(body)
+
+        data = self.local.get(key)
+        if data is not None or self.redis is None:
+            return data
+
+        raw = await self.redis.get(f"{self.prefix}:{key}")
+        if raw is None:
+            return None
+
+        data = json.loads(raw)
+        self.local.set(key, data)
+
+        return data
+
+    async def set(self, body: str, token: Token) -> None:
+        key = self.key(body)
+        owner = token.owner
+
+        data = {
+            "token": dump_columns(token),
+            "owner": dump_columns(owner),
+            "avatar": owner.avatar and dump_columns(owner.avatar),
+            "role": owner.role and dump_columns(owner.role),
+        }
+
+        self.local.set(key, data)
+
+        if self.redis is None:
+            return
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(f"{self.prefix}:{key}", json.dumps(data), ex=self.ttl)
+            pipe.sadd(f"{self.prefix}:user:{owner.id}", key)
+            pipe.expire(f"{self.prefix}:user:{owner.id}", self.ttl)
+
+            if owner.role_id is not None:
+                pipe.sadd(f"{self.prefix}:role:{owner.role_id}", key)
+                pipe.expire(f"{self.prefix}:role:{owner.role_id}", self.ttl)
+
+            await pipe.execute()
+
+    @staticmethod
+    async def restore(session: AsyncSession, data: dict[str, Any]) -> Token:
+        """Attach cached token to session without emitting any query"""
+        token = load_detached(Token, data["token"])
+        owner = load_detached(User, data["owner"])
+
+        avatar = data["avatar"] and load_detached(UploadImage, data["avatar"])
+        role = data["role"] and load_detached(Role, data["role"])
+
+        set_committed_value(owner, "avatar", avatar)
+        set_committed_value(owner, "role", role)
+        set_committed_value(token, "owner", owner)
+
+        return await session.merge(token, load=False)
+
+    async def drop(self, body: str) -> None:
+        key = self.key(body)
+        self.local.pop(key)
+
+        if self.redis is not None:
+            await self.redis.delete(f"{self.prefix}:{key}")
+
+    async def _drop_group(self, group: str, field: str, value: int) -> None:
+        for key, data in self.local.items():
+            if data["owner"][field] == value:
+                self.local.pop(key)
+
+        if self.redis is None:
+            return
+
+        group_key = f"{self.prefix}:{group}:{value}"
+        keys = await self.redis.smembers(group_key)
+
+        await self.redis.delete(group_key, *(f"{self.prefix}:{key.decode()}" for key in keys))
+
+    async def drop_user(self, user_id: int) -> None:
+        """Drop all cached tokens of user"""
+        await self._drop_group("user", "id", user_id)
+
+    async def drop_role(self, role_id: int) -> None:
+        """Drop all cached tokens of users with role"""
+        await self._drop_group("role", "role_id", role_id)
+
+
+token_cache = TokenCache(
+    constants.TOKEN_CACHE_SIZE,
+    constants.TOKEN_CACHE_LOCAL_TTL,
+    constants.TOKEN_CACHE_TTL,
+)
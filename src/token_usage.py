@@ -0,0 +1,142 @@
+import time
+import asyncio
+import logging
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, cast, column, func, update, values
+
+from src import constants
+from src.util import metric, now
+from src.models import Token
+from src.token_cache import token_cache
+from src.database import session_holder
+
+logger = logging.getLogger(__name__)
+
+
+class TokenUsageBuffer:
+    """
+    Write-behind buffer of token usage.
+
+    Collects ``used_at`` and ``expire_at`` of tokens in worker's memory
+    and writes them to database with one bulk update.
+
+    Values are merged with ``GREATEST`` both in buffer and in database,
+    so flushes from different workers may run concurrently and in any order.
+    """
+
+    def __init__(self):
+        # token id -> (used_at, expire_at | None)
+        self.tokens: dict[int, tuple[datetime, datetime | None]] = {}
+        # token id -> body, of tokens which expiration time was prolonged
+        self.prolonged: dict[int, str] = {}
+
+        self.interval: float | None = None
+        self._task: asyncio.Task | None = None
+        self._stopped = asyncio.Event()
+
+    def setup(self, interval: float | None) -> None:
+        """
+        Set flush interval. If interval is None - buffer is flushed right after each record
+        """
+        self.interval = interval
+
+    def start(self) -> None:
+        if self.interval is not None and self._task is None:
+            self._stopped.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            # Let flush in progress finish, cancelling it would lose its batch
+            self._stopped.set()
+            await self._task
+            self._task = None
+
+        await self.flush()
+
+    async def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                await asyncio.wait_for(self._stopped.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+            try:
+                await self.flush()
+            except Exception:  # noqa
+                logger.exception("Token usage flush failed")
+
+    def _merge(
+        self, tokens: dict[int, tuple[datetime, datetime | None]], prolonged: dict[int, str]
+    ) -> None:
+        for id_, (used_at, expire_at) in tokens.items():
+            if id_ in self.tokens:
+                buffered_used_at, buffered_expire_at = self.tokens[id_]
+                used_at = max(used_at, buffered_used_at)
+                expire_at = max(filter(None, (expire_at, buffered_expire_at)), default=None)
+
+            self.tokens[id_] = (used_at, expire_at)
+
+        self.prolonged.update(prolonged)
+
+    async def record(self, token: Token, prolong: bool = True) -> None:
+        """Record usage of token"""
+        expire_at = token.prolonged_expire_at() if prolong else None
+
+        prolonged = {}
+        if expire_at is not None:
+            prolonged[token.id] = token.body
+
+        self._merge({token.id: (now(), expire_at)}, prolonged)
+
+        if self.interval is None:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self.tokens:
+            return
+
+        tokens, self.tokens = self.tokens, {}
+        prolonged, self.prolonged = self.prolonged, {}
+
+        start = time.perf_counter()
+
+        try:
+            async with session_holder.session() as session:
+                touched = values(
+                    column("id", BigInteger),
+                    column("used_at", DateTime),
+                    column("expire_at", DateTime),
+                    name="touched",
+                ).data([(id_, *value) for id_, value in tokens.items()])
+
+                await session.execute(
+                    update(Token)
+                    .where(Token.id == touched.c.id)
+                    .values(
+                        used_at=func.greatest(Token.used_at, touched.c.used_at),
+                        # Column consists of NULLs when none of tokens was prolonged
+                        expire_at=func.greatest(
+                            Token.expire_at, cast(touched.c.expire_at, DateTime)
+                        ),
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+
+                await session.commit()
+        except BaseException:
+            # Keep failed (or cancelled) touches for the next flush
+            self._merge(tokens, prolonged)
+            raise
+
+        metric("token_usage.flush.size").observe(len(tokens))
+        metric("token_usage.flush.latency").observe(time.perf_counter() - start)
+
+        # Cached tokens must not outlive their prolongation
+        for body in prolonged.values():
+            await token_cache.drop(body)
+
+
+token_usage = TokenUsageBuffer()
+token_usage.setup(constants.TOKEN_USAGE_FLUSH_INTERVAL)
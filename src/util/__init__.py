@@ -9,20 +9,39 @@ from .string_util import lower
 from .datetime_util import now
 from .s3_util import delete_obj
 from .string_util import slugify
+from .metrics_util import metric
+from .cache_util import LRUCache
+from .token_util import sign_token
+from .token_util import TokenClaims
+from .token_util import token_digest
 from .image_util import file_size
 from .image_util import compress_png
+from .pagination_util import count_rows
+from .pagination_util import InvalidCursor
 from .string_util import secure_hash
 from .string_util import consists_of
 from .s3_util import upload_file_obj
 from .fastapi_util import has_errors
 from .hash_util import cache_key_hash
+from .http_util import NotModified
+from .http_util import make_etag
+from .http_util import is_not_modified
 from .string_util import verify_payload
 from .string_util import camel_to_snake
+from .metrics_util import metrics_snapshot
 from .string_util import snake_to_camel
 from .pydantic_util import format_error
 from .datetime_util import utc_timestamp
 from .sqlalchemy_util import update_by_pk
+from .sqlalchemy_util import dump_columns
 from .image_util import filter_image_size
+from .sqlalchemy_util import load_detached
+from .pagination_util import cursor_response
+from .pagination_util import keyset_paginate
+from .pagination_util import last_modified
+from .http_util import check_not_modified
+from .pagination_util import collection_version
+from .token_util import verify_signed_token
 from .string_util import email_to_nickname
 from .fastapi_util import setup_route_errors
 from .datetime_util import from_utc_timestamp
@@ -32,23 +51,38 @@ from .permissions_util import merge_permissions
 from .fastapi_util import render_route_permissions
 from .sqlalchemy_util import update_within_flush_event
 
-
 __all__ = [
     "now",
+    "metric",
     "lower",
     "slugify",
     "UseCache",
+    "LRUCache",
+    "make_etag",
     "file_size",
+    "sign_token",
+    "TokenClaims",
+    "NotModified",
+    "token_digest",
     "has_errors",
     "delete_obj",
+    "count_rows",
     "secure_hash",
     "compress_png",
+    "InvalidCursor",
     "consists_of",
     "update_by_pk",
+    "dump_columns",
     "format_error",
+    "load_detached",
     "utc_timestamp",
     "cache_key_hash",
     "camel_to_snake",
+    "cursor_response",
+    "keyset_paginate",
+    "last_modified",
+    "metrics_snapshot",
+    "is_not_modified",
     "snake_to_camel",
     "verify_payload",
     "upload_file_obj",
@@ -59,7 +93,10 @@ __all__ = [
     "merge_permissions",
     "from_utc_timestamp",
     "setup_route_errors",
+    "check_not_modified",
+    "collection_version",
     "paginated_response",
+    "verify_signed_token",
     "route_has_dependency",
     "get_offset_and_limit",
     "render_route_permissions",
@@ -76,6 +113,7 @@ def paginated_response(
     total: int,
     page: int,
     limit: int,
+    exact: bool = True,
 ):
     return {
         "items": items,
@@ -83,6 +121,7 @@ def paginated_response(
             "total": total,
             "page": page,
             "pages": math.ceil(total / limit),
+            "exact": exact,
         },
     }
 
@@ -92,7 +131,11 @@ T = typing.TypeVar("T")
 
 class UseCache(typing.Protocol):
     @staticmethod
-    async def __call__(cache_key: tuple[typing.Any, ...], coro: typing.Awaitable[T]) -> T: ...
+    async def __call__(
+        cache_key: tuple[typing.Any, ...],
+        coro: typing.Awaitable[T],
+        tags: typing.Iterable[str] = (),
+    ) -> T: ...
 
 
 class PermissionChecker(typing.Protocol):
@@ -0,0 +1,68 @@
+import time
+import typing
+from collections import OrderedDict
+
+K = typing.TypeVar("K")
+V = typing.TypeVar("V")
+
+
+class LRUCache(typing.Generic[K, V]):
+    """
+    Bounded in-process cache with least-recently-used eviction and per-entry TTL.
+
+    :param maxsize: maximum amount of entries kept in cache
+    :param ttl: default time to live of entry in seconds (None - entries never expire)
+    """
+
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float | None, V]] = OrderedDict()
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+
+        expire_at, value = entry
+        if expire_at is not None and expire_at <= time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expire_at = None if ttl is None else time.monotonic() + ttl
+
+        self._data[key] = (expire_at, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K, default: V | None = None) -> V | None:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return default
+
+        return entry[1]
+
+    def items(self) -> typing.Iterator[tuple[K, V]]:
+        """Iterate over non-expired entries without touching their recency"""
+        now = time.monotonic()
+        for key, (expire_at, value) in list(self._data.items()):
+            if expire_at is not None and expire_at <= now:
+                continue
+
+            yield key, value
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._data)
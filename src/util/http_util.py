@@ -0,0 +1,78 @@
+from hashlib import blake2b
+from typing import Mapping
+from datetime import datetime, UTC
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+
+class NotModified(Exception):
+    """Client's copy of resource is up to date, respond with 304"""
+
+    def __init__(self, headers: dict[str, str]):
+        self.headers = headers
+
+    @property
+    def response(self) -> Response:
+        return Response(status_code=304, headers=self.headers)
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag of resource version, parts must consist of primitives and datetimes"""
+    return '"' + blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest() + '"'
+
+
+def http_date(date: datetime) -> str:
+    return format_datetime(date.replace(tzinfo=UTC, microsecond=0), usegmt=True)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+
+    # If-None-Match uses weak comparison
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return True
+
+    if since.tzinfo is None:
+        return True
+
+    # HTTP dates have second precision
+    return last_modified.replace(tzinfo=UTC, microsecond=0) > since
+
+
+def is_not_modified(
+    headers: Mapping[str, str], etag: str | None, last_modified: datetime | None
+) -> bool:
+    """
+    Whether client's copy of resource with given validators is up to date, according to
+    request headers. If-None-Match takes precedence over If-Modified-Since
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag is not None and etag_matches(if_none_match, etag)
+
+    if_modified_since = headers.get("if-modified-since")
+    return (
+        if_modified_since is not None
+        and last_modified is not None
+        and not modified_since(if_modified_since, last_modified)
+    )
+
+
+def check_not_modified(
+    request: Request, response: Response, etag: str, last_modified: datetime | None = None
+) -> None:
+    """Set validators of resource to response, raise NotModified if client's copy is up to date"""
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+
+    if is_not_modified(request.headers, etag, last_modified):
+        raise NotModified(dict(response.headers))
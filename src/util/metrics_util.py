@@ -0,0 +1,34 @@
+from dataclasses import dataclass, asdict
+
+
+@dataclass
+class Metric:
+    """Aggregated observations of single value (flush size, latency, hits, etc.)"""
+
+    count: int = 0
+    total: float = 0
+    max: float = 0
+    last: float = 0
+
+    def observe(self, value: float = 1) -> None:
+        self.count += 1
+        self.total += value
+        self.last = value
+        if value > self.max:
+            self.max = value
+
+    def reset(self) -> None:
+        self.count = 0
+        self.total = self.max = self.last = 0
+
+
+metrics: dict[str, Metric] = {}
+
+
+def metric(name: str) -> Metric:
+    """Get or create metric by name"""
+    return metrics.setdefault(name, Metric())
+
+
+def metrics_snapshot() -> dict[str, dict[str, float]]:
+    return {name: asdict(value) for name, value in sorted(metrics.items())}
@@ -0,0 +1,141 @@
+import json
+import base64
+import binascii
+from datetime import datetime
+from typing import Any, Sequence
+
+from sqlalchemy import DateTime, Select, tuple_, select, func
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.expression import Executable, ClauseElement, ColumnElement
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode key values of last item on page to opaque cursor"""
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, keys: Sequence[InstrumentedAttribute]) -> tuple[Any, ...]:
+    """Decode cursor to key values, converted to types of keys"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise InvalidCursor(cursor) from e
+
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise InvalidCursor(cursor)
+
+    result = []
+    for key, value in zip(keys, values):
+        try:
+            if isinstance(key.type, DateTime):
+                value = datetime.fromisoformat(value)
+
+            elif not isinstance(value, key.type.python_type):
+                raise InvalidCursor(cursor)
+
+        except (TypeError, ValueError) as e:
+            raise InvalidCursor(cursor) from e
+
+        result.append(value)
+
+    return tuple(result)
+
+
+def keyset_paginate(
+    query: Select,
+    keys: Sequence[InstrumentedAttribute],
+    cursor: str,
+    limit: int,
+    descending: bool = False,
+) -> Select:
+    """
+    Order query by keys and select rows that go after cursor (empty cursor - first page).
+
+    One extra row is selected to know whether there is next page without counting rows
+    """
+    query = query.order_by(*(key.desc() if descending else key for key in keys)).limit(limit + 1)
+
+    if cursor:
+        values = decode_cursor(cursor, keys)
+        after = tuple_(*keys) < values if descending else tuple_(*keys) > values
+        query = query.filter(after)
+
+    return query
+
+
+def cursor_response(
+    items: Sequence[Any], limit: int, keys: Sequence[InstrumentedAttribute]
+) -> dict[str, Any]:
+    next_ = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_ = encode_cursor([getattr(items[-1], key.key) for key in keys])
+
+    return {"items": items, "next": next_}
+
+
+async def estimate_rows(session: AsyncSession, query: Select) -> int:
+    """Amount of rows query returns, estimated by planner"""
+    plan = await session.scalar(Explain(query))
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_rows(
+    session: AsyncSession, query: Select, strategy: str, threshold: int
+) -> tuple[int, bool]:
+    """
+    Count rows query returns. Return count and whether it is exact.
+
+    With "estimate" strategy planner estimate is used when it is not below threshold,
+    smaller results are counted exactly
+    """
+    if strategy == "estimate":
+        estimate = await estimate_rows(session, query)
+        if estimate >= threshold:
+            return estimate, False
+
+    return await session.scalar(select(func.count()).select_from(query.subquery())), True
+
+
+def last_modified(*models) -> ColumnElement:
+    """Time of last modification of row(s) of models"""
+    columns = [func.coalesce(model.updated_at, model.created_at) for model in models]
+    return columns[0] if len(columns) == 1 else func.greatest(*columns)
+
+
+async def collection_version(
+    session: AsyncSession, query: Select, modified: ColumnElement
+) -> tuple[datetime | None, int]:
+    """
+    Last modification time and size of collection (rows of query).
+
+    Size is part of version, as deleted rows don't leave modification time
+    """
+    latest, size = (
+        await session.execute(query.with_only_columns(func.max(modified), func.count()))
+    ).one()
+
+    return latest, size
@@ -10,6 +10,7 @@ from typing import Sequence, Mapping
 from .matching import satisfies
 from .permission import Permission
 from .merge import merge_permissions
+from .bitset import PermissionBitset, permission_parts
 from .parse import parse_permission, parse_schema
 from .generate import generate_permission, generate_permissions, generate_pyi, generate_pyi_file
 
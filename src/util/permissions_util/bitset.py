@@ -0,0 +1,89 @@
+from functools import lru_cache
+from typing import Iterable, Mapping, Sequence
+
+from .matching import satisfies
+from .permission import Permission
+from .parse import parse_permission
+
+PermissionLike = str | tuple[str, ...] | Permission
+
+
+@lru_cache(maxsize=4096)
+def _parse_parts(permission: str) -> tuple[str, ...]:
+    return tuple(parse_permission(permission)["parts"])
+
+
+def permission_parts(permission: PermissionLike) -> tuple[str, ...]:
+    if isinstance(permission, Permission):
+        return tuple(permission.parts)
+
+    if isinstance(permission, str):
+        return _parse_parts(permission)
+
+    return tuple(permission)
+
+
+class PermissionBitset:
+    """
+    Compiled representation of permission schema.
+
+    Each concrete permission (one without wildcards) gets a bit, and any permission expands
+    to the mask of concrete permissions it satisfies. Set of available permissions becomes
+    an integer, so checking concrete required permissions is a single AND.
+
+    :param permissions: all permissions of schema (see ``generate_permissions``)
+    :param cache_size: amount of memoized available permission sets
+    """
+
+    def __init__(self, permissions: Iterable[str], cache_size: int = 1024):
+        self.bits: dict[tuple[str, ...], int] = {}
+
+        for permission in permissions:
+            parts = permission_parts(permission)
+            if not parts or "*" in parts:
+                continue
+
+            self.bits.setdefault(parts, 1 << len(self.bits))
+
+        self._available_mask = lru_cache(maxsize=cache_size)(self._compile_available)
+
+    @lru_cache(maxsize=None)
+    def permission_mask(self, parts: tuple[str, ...]) -> int:
+        """Mask of concrete permissions satisfied by permission"""
+        mask = 0
+        for concrete, bit in self.bits.items():
+            if satisfies(parts, concrete):
+                mask |= bit
+
+        return mask
+
+    def required_mask(self, required: Sequence[PermissionLike]) -> int | None:
+        """Mask of required permissions or None if any of them is not concrete"""
+        mask = 0
+        for permission in required:
+            bit = self.bits.get(permission_parts(permission))
+            if bit is None:
+                return None
+
+            mask |= bit
+
+        return mask
+
+    def _compile_available(self, available: frozenset[tuple[tuple[str, ...], bool]]) -> int:
+        mask = 0
+        for parts, allowed in available:
+            if allowed:
+                mask |= self.permission_mask(parts)
+
+        return mask
+
+    def available_mask(self, available: Mapping[PermissionLike, bool]) -> int:
+        """Mask of permissions granted by available permissions, memoized per permission set"""
+        return self._available_mask(
+            frozenset(
+                (permission_parts(permission), allowed) for permission, allowed in available.items()
+            )
+        )
+
+    def check(self, required_mask: int, available: Mapping[PermissionLike, bool]) -> bool:
+        return self.available_mask(available) & required_mask == required_mask
@@ -1,9 +1,12 @@
+from datetime import datetime
 from functools import lru_cache
-from typing import cast, Any, Mapping
+from typing import cast, Any, Mapping, TypeVar
 
-from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy import Column, Update, update, Connection
 from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm import DeclarativeBase, make_transient_to_detached
+from sqlalchemy import Column, Update, DateTime, LargeBinary, update, inspect, Connection
+
+M = TypeVar("M", bound=DeclarativeBase)
 
 
 @lru_cache(maxsize=64)
@@ -38,3 +41,50 @@ def update_within_flush_event(object_: DeclarativeBase, connection: Connection,
         update_values[name] = value
 
     connection.execute(update_by_pk(model, pk_value, **update_values))
+
+
+def dump_columns(object_: DeclarativeBase) -> dict[str, Any]:
+    """Dump loaded column attributes of object to json-compatible dictionary"""
+    values: dict[str, Any] = {}
+    for attr in inspect(type(object_)).column_attrs:
+        value = getattr(object_, attr.key)
+
+        if isinstance(value, datetime):
+            value = value.isoformat()
+
+        elif isinstance(value, dict):
+            value = dict(value)
+
+        elif isinstance(value, bytes):
+            value = value.hex()
+
+        values[attr.key] = value
+
+    return values
+
+
+def load_detached(model: type[M], values: Mapping[str, Any]) -> M:
+    """
+    Build detached instance of model from values dumped by ``dump_columns``.
+
+    Instance behaves as if it was loaded from database and can be attached to session
+    using ``session.merge(instance, load=False)`` without emitting any query
+    """
+    kwargs: dict[str, Any] = {}
+    for attr in inspect(model).column_attrs:
+        if attr.key not in values:
+            continue
+
+        value = values[attr.key]
+        if value is not None and isinstance(attr.columns[0].type, DateTime):
+            value = datetime.fromisoformat(value)
+
+        elif value is not None and isinstance(attr.columns[0].type, LargeBinary):
+            value = bytes.fromhex(value)
+
+        kwargs[attr.key] = value
+
+    object_ = model(**kwargs)
+    make_transient_to_detached(object_)
+
+    return object_
@@ -0,0 +1,69 @@
+import hmac
+import struct
+import secrets
+from hashlib import sha256
+from dataclasses import dataclass
+from datetime import datetime, UTC
+
+from .datetime_util import now
+
+# owner id, token generation, expiration timestamp, token id
+_claims = struct.Struct(">QIIQ")
+_signature_size = sha256().digest_size
+
+
+@dataclass(frozen=True)
+class TokenClaims:
+    owner_id: int
+    generation: int
+    expire_at: datetime
+    jti: int
+
+    def expired(self) -> bool:
+        return now() >= self.expire_at
+
+
+def token_digest(body: str) -> bytes:
+    """Digest under which token is stored, plain tokens never reach database"""
+    return sha256(body.encode()).digest()
+
+
+def sign_token(key: bytes, owner_id: int, generation: int, expire_at: datetime) -> str:
+    """
+    Create token that carries its claims signed with HMAC-SHA256.
+
+    Token is hex-encoded, so it satisfies the same format as random tokens
+    """
+    payload = _claims.pack(
+        owner_id,
+        generation,
+        int(expire_at.replace(tzinfo=UTC).timestamp()),
+        secrets.randbits(64),
+    )
+    signature = hmac.new(key, payload, sha256).digest()
+
+    return (payload + signature).hex()
+
+
+def verify_signed_token(key: bytes, body: str) -> TokenClaims | None:
+    """Return claims of the token if its signature is valid"""
+    if len(body) != (_claims.size + _signature_size) * 2:
+        return None
+
+    try:
+        raw = bytes.fromhex(body)
+    except ValueError:
+        return None
+
+    payload, signature = raw[: _claims.size], raw[_claims.size :]
+    if not hmac.compare_digest(signature, hmac.new(key, payload, sha256).digest()):
+        return None
+
+    owner_id, generation, expire_at, jti = _claims.unpack(payload)
+
+    return TokenClaims(
+        owner_id=owner_id,
+        generation=generation,
+        expire_at=datetime.fromtimestamp(expire_at, UTC).replace(tzinfo=None),
+        jti=jti,
+    )
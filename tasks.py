@@ -41,6 +41,16 @@ def init_db():
     return session_holder
 
 
+@lru_cache(maxsize=-1)
+def init_presence():
+    from redis.asyncio import Redis
+    from src.presence import presence
+
+    presence.setup(Redis.from_url(settings.redis.url))
+
+    return presence
+
+
 def get_session() -> AsyncSession:
     return init_db().session()
 
@@ -115,8 +125,18 @@ async def user_nickname_updated(
 async def periodiq_drop_expired_tokens(session: AsyncSession):
     from src.service import drop_expired_tokens
 
-    log("Dropping all expired tokens")
-    await drop_expired_tokens(session)
+    log("Dropping expired tokens")
+    log("Dropped", await drop_expired_tokens(session), "expired tokens")
+
+
+@dramatiq.actor(periodic=cron("* * * * *"))
+@with_session
+async def periodiq_sync_presence(session: AsyncSession):
+    from src.service import sync_presence
+
+    init_presence()
+
+    log("Synced presence of", await sync_presence(session), "online users")
 
 
 @dramatiq.actor(max_retries=3)
@@ -1,6 +1,11 @@
+import asyncio
+import threading
+
+import pytest
 from async_asgi_testclient import TestClient
 
 from src.ratelimit import memory_store
+from src.password_hasher import password_hasher
 from tests import requests
 
 
@@ -49,3 +54,45 @@ async def test_nonexistent(client: TestClient, user_regular, password_user):
 
     assert response.json().get("code") == "user-not-found"
     assert response.json().get("category") == "auth"
+
+
+async def test_hasher_overloaded(client: TestClient, user_regular, password_user, monkeypatch):
+    monkeypatch.setattr(
+        password_hasher, "pending", password_hasher.workers + password_hasher.queue_size
+    )
+
+    response = await requests.auth.signin(client, user_regular.email, None, password_user)
+    print(response.json())
+    assert response.status_code == 503
+
+    assert response.json().get("code") == "overloaded"
+    assert response.json().get("category") == "auth"
+
+
+async def test_hasher_cancelled_request():
+    started, release = threading.Event(), threading.Event()
+
+    def job() -> bool:
+        started.set()
+        return release.wait(5)
+
+    pending = password_hasher.pending
+    task = asyncio.create_task(password_hasher._run("verify", job))
+    while not started.is_set():
+        await asyncio.sleep(0.01)
+
+    # Client disconnected, but job still occupies the pool
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert password_hasher.pending == pending + 1
+
+    release.set()
+    for _ in range(100):
+        if password_hasher.pending == pending:
+            break
+
+        await asyncio.sleep(0.01)
+
+    assert password_hasher.pending == pending
@@ -1,6 +1,7 @@
 import secrets
 
 from tests import requests
+from src.password_hasher import password_hasher
 
 from async_asgi_testclient import TestClient
 
@@ -46,3 +47,32 @@ async def test_existing_user_nickname(
 
     assert error.get("code") == "nickname-occupied"
     assert error.get("category") == "auth"
+
+
+async def test_existing_user_not_hashed(
+    client: TestClient, user_regular, role_unverified, password_user, monkeypatch
+):
+    # Taken email is reported without waiting for hasher
+    monkeypatch.setattr(
+        password_hasher, "pending", password_hasher.workers + password_hasher.queue_size
+    )
+
+    response = await requests.auth.signup(
+        client, user_regular.email, secrets.token_hex(16), password_user
+    )
+    print(response.json())
+    assert response.status_code == 400
+
+    assert response.json().get("code") == "email-occupied"
+    assert response.json().get("category") == "auth"
+
+
+async def test_no_default_role(client: TestClient, password_user):
+    response = await requests.auth.signup(client, "pec@mail.com", "pecpec", password_user)
+    print(response.json())
+    assert response.status_code == 500
+
+    error = response.json()
+
+    assert error.get("code") == "default-role-not-exist"
+    assert error.get("category") == "roles"
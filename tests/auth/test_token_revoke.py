@@ -0,0 +1,65 @@
+from async_asgi_testclient import TestClient
+
+from tests import requests
+
+
+async def test_normal(client: TestClient, token_regular):
+    response = await requests.auth.revoke_tokens(client, token_regular.body)
+    print(response.json())
+    assert response.status_code == 200
+
+    response = await requests.auth.token_info(client, token_regular.body)
+    print(response.json())
+    assert response.status_code == 401
+
+    assert response.json().get("code") == "required"
+    assert response.json().get("category") == "token"
+
+
+async def test_signed(client: TestClient, signed_tokens, user_regular, password_user):
+    response = await requests.auth.signin(client, None, user_regular.nickname, password_user)
+    print(response.json())
+    assert response.status_code == 200
+
+    token = response.json()["token"]
+
+    response = await requests.auth.token_info(client, token)
+    print(response.json())
+    assert response.status_code == 200
+    assert response.json().get("owner", {}).get("id") == user_regular.id
+
+    response = await requests.auth.revoke_tokens(client, token)
+    print(response.json())
+    assert response.status_code == 200
+
+    response = await requests.auth.token_info(client, token)
+    print(response.json())
+    assert response.status_code == 401
+
+    assert response.json().get("code") == "revoked"
+    assert response.json().get("category") == "token"
+
+
+async def test_signed_forged(client: TestClient, signed_tokens, user_regular, password_user):
+    response = await requests.auth.signin(client, None, user_regular.nickname, password_user)
+    print(response.json())
+    assert response.status_code == 200
+
+    token = response.json()["token"]
+    forged = token[:-1] + ("0" if token[-1] != "0" else "1")
+
+    response = await requests.auth.token_info(client, forged)
+    print(response.json())
+    assert response.status_code == 401
+
+    assert response.json().get("code") == "required"
+    assert response.json().get("category") == "token"
+
+
+async def test_signed_rejects_random(client: TestClient, signed_tokens, token_regular):
+    response = await requests.auth.token_info(client, token_regular.body)
+    print(response.json())
+    assert response.status_code == 401
+
+    assert response.json().get("code") == "required"
+    assert response.json().get("category") == "token"
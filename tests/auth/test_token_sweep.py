@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from sqlalchemy import select, func
+
+from tests import helpers
+from src.models import Token
+from src.service import drop_expired_tokens
+
+
+async def test_batches(session, user_regular, token_regular):
+    for _ in range(5):
+        await helpers.create_token(session, user_regular, timedelta(days=-3))
+
+    assert await drop_expired_tokens(session, batch_size=2) == 5
+
+    assert await session.scalar(select(func.count(Token.id))) == 1
+
+
+async def test_time_budget(session, user_regular):
+    for _ in range(5):
+        await helpers.create_token(session, user_regular, timedelta(days=-3))
+
+    assert await drop_expired_tokens(session, batch_size=2, time_budget=0) == 2
@@ -15,6 +15,12 @@ from src.util import secure_hash
 from contextlib import ExitStack
 from src.permissions import permissions
 from src.database import session_holder
+from src.presence import presence
+from src.suggest import suggest_index
+from src.catalog_snapshot import catalog_snapshot
+from src.token_cache import token_cache
+from src.result_cache import result_cache
+from src.signed_tokens import token_generations
 from pytest_postgresql import factories
 from sqlalchemy import make_url, URL, delete
 from async_asgi_testclient import TestClient
@@ -67,6 +73,31 @@ def _ratelimit_cleanup():
     memory_ranking().clear()
 
 
+@pytest.fixture(autouse=True)
+def _cache_cleanup():
+    yield
+    token_cache.clear()
+    result_cache.clear()
+    token_generations.clear()
+    presence.clear()
+    suggest_index.clear()
+    catalog_snapshot.clear()
+
+
+@pytest.fixture
+def signed_tokens():
+    config.settings.set("tokens.mode", "signed")
+    yield
+    config.settings.set("tokens.mode", "opaque")
+
+
+@pytest.fixture
+def catalog_snapshot_enabled():
+    config.settings.set("catalog.snapshot", True)
+    yield
+    config.settings.set("catalog.snapshot", False)
+
+
 @pytest.fixture
 def x_real_ip() -> str:
     return "test-ip"
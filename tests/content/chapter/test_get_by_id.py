@@ -1,3 +1,4 @@
+from src import constants
 from tests import requests
 from tests.helpers import assert_contain
 
@@ -22,3 +23,67 @@ async def test_normal(client, chapter):
         computed_title=chapter.computed_title,
         pages=chapter.pages,
     )
+
+
+async def test_cached(client, token_admin, composition, chapter, session):
+    composition.style = constants.STYLE_COMPOSITION_RANOBE
+    await session.commit()
+
+    response = await requests.content.get_chapter(client, chapter.id)
+    assert response.headers["surrogate-key"] == f"chapter:{chapter.id}"
+    assert "x-cache" not in response.headers
+
+    response = await requests.content.get_chapter(client, chapter.id)
+    assert response.headers["x-cache"] == "HIT"
+    assert response.json()["pages"] == 0
+
+    # Clients with token are never served from cache
+    response = await client.get(
+        f"/content/chapter/{chapter.id}", headers={"Token": token_admin.body}
+    )
+    assert "x-cache" not in response.headers
+
+    # Publishing page purges the chapter
+    response = await requests.content.create_text_page(
+        client, token_admin.body, chapter.id, "page text" * 100, 1
+    )
+    assert response.status_code == 200
+
+    response = await requests.content.get_chapter(client, chapter.id)
+    assert "x-cache" not in response.headers
+    assert response.json()["pages"] == 1
+
+
+async def test_not_modified(client, token_admin, composition, chapter, session):
+    composition.style = constants.STYLE_COMPOSITION_RANOBE
+    await session.commit()
+
+    response = await requests.content.get_chapter(client, chapter.id)
+    etag = response.headers["etag"]
+    last_modified = response.headers["last-modified"]
+
+    # Served by response cache
+    response = await client.get(f"/content/chapter/{chapter.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["x-cache"] == "HIT"
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+    # Served by route
+    response = await client.get(
+        f"/content/chapter/{chapter.id}",
+        headers={"Token": token_admin.body, "If-Modified-Since": last_modified},
+    )
+    assert response.status_code == 304
+    assert "x-cache" not in response.headers
+    assert response.headers["etag"] == etag
+
+    response = await requests.content.create_text_page(
+        client, token_admin.body, chapter.id, "page text" * 100, 1
+    )
+    assert response.status_code == 200
+
+    response = await client.get(f"/content/chapter/{chapter.id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["pages"] == 1
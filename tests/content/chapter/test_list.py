@@ -1,4 +1,5 @@
-from tests import requests
+from src import constants
+from tests import requests, helpers
 from tests.helpers import assert_contain
 
 
@@ -15,7 +16,9 @@ async def test_none(client, volume):
     print(response.json())
     assert response.status_code == 200
 
-    assert_contain(response.json(), pagination={"total": 0, "pages": 0, "page": 1}, items=[])
+    assert_contain(
+        response.json(), pagination={"total": 0, "pages": 0, "page": 1, "exact": True}, items=[]
+    )
 
 
 async def test_normal(client, volume, chapter):
@@ -23,7 +26,7 @@ async def test_normal(client, volume, chapter):
     print(response.json())
     assert response.status_code == 200
 
-    assert response.json()["pagination"] == {"total": 1, "pages": 1, "page": 1}
+    assert response.json()["pagination"] == {"total": 1, "pages": 1, "page": 1, "exact": True}
 
     assert_contain(
         response.json()["items"][0],
@@ -32,3 +35,37 @@ async def test_normal(client, volume, chapter):
         computed_title=chapter.computed_title,
         pages=chapter.pages,
     )
+
+
+async def test_cursor(client, session, volume):
+    for index in range(1, constants.DEFAULT_PAGE_SIZE + 3):
+        await helpers.create_chapter(session, volume, index)
+
+    response = await requests.content.list_chapters(client, volume.id, cursor="")
+    print(response.json())
+    assert response.status_code == 200
+
+    first = response.json()
+    assert "pagination" not in first
+    assert first["next"] is not None
+    assert [item["index"] for item in first["items"]] == list(
+        range(1, constants.DEFAULT_PAGE_SIZE + 1)
+    )
+
+    response = await requests.content.list_chapters(client, volume.id, cursor=first["next"])
+    print(response.json())
+    assert response.status_code == 200
+
+    assert_contain(response.json(), next=None)
+    assert [item["index"] for item in response.json()["items"]] == [
+        constants.DEFAULT_PAGE_SIZE + 1,
+        constants.DEFAULT_PAGE_SIZE + 2,
+    ]
+
+
+async def test_invalid_cursor(client, volume):
+    response = await requests.content.list_chapters(client, volume.id, cursor="bm9wZQ")
+    print(response.json())
+    assert response.status_code == 400
+
+    assert_contain(response.json(), category="pagination", code="invalid-cursor")
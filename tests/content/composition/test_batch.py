@@ -0,0 +1,27 @@
+from src import constants
+from tests import requests, helpers
+from tests.helpers import assert_composition
+
+
+async def test_normal(client, session, composition):
+    other = await helpers.create_composition(session, "Other")
+
+    response = await requests.content.get_compositions_batch(
+        client, [other.id, composition.slug, 0, "non-existent", other.slug]
+    )
+    print(response.json())
+    assert response.status_code == 200
+
+    assert response.json()["missing"] == [0, "non-existent"]
+
+    items = response.json()["items"]
+    assert [item["id"] for item in items] == [other.id, composition.id, other.id]
+    assert_composition(items[1], composition)
+
+
+async def test_too_many(client):
+    keys = list(range(constants.COMPOSITION_BATCH_SIZE + 1))
+
+    response = await requests.content.get_compositions_batch(client, keys)
+    print(response.json())
+    assert response.status_code == 422
@@ -0,0 +1,68 @@
+from src import constants
+from tests import requests, helpers
+
+
+async def test_none(client):
+    response = await requests.content.composition_facets(client)
+    print(response.json())
+    assert response.status_code == 200
+
+    assert response.json() == {"genres": [], "styles": [], "tags": [], "years": []}
+
+
+async def test_normal(client, session, genre):
+    first = await helpers.create_composition(session, "First", year=2000, tags=["a", "b"])
+    second = await helpers.create_composition(
+        session, "Second", year=2001, tags=["a"], style=constants.STYLE_COMPOSITION_MANHWA
+    )
+    await helpers.create_composition(session, "Third", year=None)
+
+    first.genres.append(genre)
+    second.genres.append(genre)
+    await session.commit()
+
+    response = await requests.content.composition_facets(client)
+    print(response.json())
+    assert response.status_code == 200
+
+    assert response.json() == {
+        "genres": [{"value": genre.slug, "count": 2}],
+        "styles": [
+            {"value": constants.STYLE_COMPOSITION_MANGA, "count": 2},
+            {"value": constants.STYLE_COMPOSITION_MANHWA, "count": 1},
+        ],
+        "tags": [{"value": "a", "count": 2}, {"value": "b", "count": 1}],
+        "years": [{"value": 2000, "count": 1}, {"value": 2001, "count": 1}],
+    }
+
+
+async def test_filters(client, session):
+    await helpers.create_composition(session, "First", year=2000, tags=["a", "b"])
+    await helpers.create_composition(session, "Second", year=2001, tags=["a"])
+
+    response = await requests.content.composition_facets(client, tags=["b"])
+    print(response.json())
+    assert response.status_code == 200
+
+    assert response.json()["tags"] == [{"value": "a", "count": 1}, {"value": "b", "count": 1}]
+    assert response.json()["years"] == [{"value": 2000, "count": 1}]
+
+
+async def test_counted_once(client, session, genre):
+    comedy = await helpers.create_genre(session, "Comedy", "Комедія", "comedy")
+    duplicate = await helpers.create_genre(session, "Drama", "Драма", genre.slug)
+
+    composition = await helpers.create_composition(session, "First", tags=["a", "b", "c"])
+    composition.genres.extend([genre, comedy, duplicate])
+    await session.commit()
+
+    response = await requests.content.composition_facets(client)
+    print(response.json())
+    assert response.status_code == 200
+
+    assert response.json()["genres"] == [
+        {"value": comedy.slug, "count": 1},
+        {"value": genre.slug, "count": 1},
+    ]
+    assert [item["count"] for item in response.json()["tags"]] == [1, 1, 1]
+    assert response.json()["years"] == [{"value": 2000, "count": 1}]
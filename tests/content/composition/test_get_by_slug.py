@@ -1,3 +1,10 @@
+import asyncio
+
+from sqlalchemy import select
+
+from src.models import Composition
+from src.response_cache import purge_surrogate_keys
+from src.routes.content.composition import service
 from tests import requests
 from tests.helpers import assert_composition, assert_contain
 
@@ -20,3 +27,108 @@ async def test_normal(client, composition):
     assert response.status_code == 200
 
     assert_composition(response.json(), composition)
+
+
+async def get_card(session, composition):
+    return await session.scalar(select(Composition.card).filter(Composition.id == composition.id))
+
+
+async def test_card(client, session, composition):
+    assert await get_card(session, composition) is None
+
+    response = await requests.content.composition_by_slug(client, composition.slug)
+    assert response.status_code == 200
+
+    assert await get_card(session, composition) == response.json()
+
+    # Stored card is served
+    response = await requests.content.composition_by_slug(client, composition.slug)
+    assert response.status_code == 200
+    assert_composition(response.json(), composition)
+
+
+async def test_card_stale_genre(client, session, composition, genre):
+    response = await requests.content.composition_by_slug(client, composition.slug)
+    assert response.json()["genres"] == []
+
+    composition.genres.append(genre)
+    await session.commit()
+
+    assert await get_card(session, composition) is None
+
+    # Genres are changed bypassing services, which purge cached responses
+    await purge_surrogate_keys([f"composition:{composition.id}"])
+
+    response = await requests.content.composition_by_slug(client, composition.slug)
+    assert [genre_["slug"] for genre_ in response.json()["genres"]] == [genre.slug]
+
+    genre.name_en = "Comedy"
+    await session.commit()
+
+    assert await get_card(session, composition) is None
+
+    await purge_surrogate_keys([f"composition:{composition.id}"])
+
+    response = await requests.content.composition_by_slug(client, composition.slug)
+    assert response.json()["genres"][0]["name_en"] == "Comedy"
+
+
+async def test_not_modified_stale_genre(client, session, composition, genre):
+    composition.genres.append(genre)
+    await session.commit()
+
+    response = await requests.content.composition_by_slug(client, composition.slug)
+    etag = response.headers["etag"]
+
+    response = await client.get(
+        f"/content/composition/{composition.slug}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    genre.name_en = "Comedy"
+    await session.commit()
+
+    await purge_surrogate_keys([f"composition:{composition.id}"])
+
+    response = await client.get(
+        f"/content/composition/{composition.slug}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["genres"][0]["name_en"] == "Comedy"
+
+
+async def test_card_stale_variant(client, session, token_admin, composition):
+    response = await requests.content.composition_by_slug(client, composition.slug)
+    assert response.json()["variants"] == 0
+
+    response = await requests.content.publish_composition_variant(
+        client, token_admin.body, composition.slug, "sometitle", "somesynopsis"
+    )
+    assert response.status_code == 200
+
+    assert await get_card(session, composition) is None
+
+    response = await requests.content.composition_by_slug(client, composition.slug)
+    assert response.json()["variants"] == 1
+
+
+async def test_coalesced(client, composition, monkeypatch):
+    get_composition_card = service.get_composition_card
+    calls = []
+
+    async def slow_get_composition_card(session, slug):
+        calls.append(slug)
+        await asyncio.sleep(0.1)
+        return await get_composition_card(session, slug)
+
+    monkeypatch.setattr(service, "get_composition_card", slow_get_composition_card)
+
+    responses = await asyncio.gather(
+        *(requests.content.composition_by_slug(client, composition.slug) for _ in range(5))
+    )
+
+    assert calls == [composition.slug]
+    for response in responses:
+        assert response.status_code == 200
+        assert_composition(response.json(), composition)
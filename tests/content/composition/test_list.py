@@ -1,4 +1,7 @@
-from tests import requests
+from src.result_cache import result_cache
+from src.routes.content.composition import service
+from src import constants
+from tests import requests, helpers
 from tests.helpers import assert_composition
 
 
@@ -11,6 +14,7 @@ async def test_none(client):
         "total": 0,
         "pages": 0,
         "page": 1,
+        "exact": True,
     }
 
     assert response.json()["items"] == []
@@ -25,6 +29,7 @@ async def test_empty_filters(client, composition):
         "total": 1,
         "pages": 1,
         "page": 1,
+        "exact": True,
     }
 
     assert_composition(response.json()["items"][0], composition)
@@ -44,11 +49,47 @@ async def test_genres(client, composition, genre, session):
         "total": 1,
         "pages": 1,
         "page": 1,
+        "exact": True,
     }
 
     assert_composition(response.json()["items"][0], composition)
 
 
+async def test_genres_duplicated_slug(client, composition, genre, session):
+    # Genre slugs are not unique, any of genres with the slug matches
+    duplicate = await helpers.create_genre(session, "Drama", "Драма", genre.slug)
+    composition.genres.append(duplicate)
+    await session.commit()
+
+    response = await requests.content.list_compositions(client, genres=[genre.slug])
+    print(response.json())
+    assert response.status_code == 200
+
+    assert response.json()["pagination"]["total"] == 1
+    assert_composition(response.json()["items"][0], composition)
+
+
+async def test_nsfw(client, composition, session):
+    nsfw = await helpers.create_composition(session, "Berserk", nsfw=True)
+
+    response = await requests.content.list_compositions(client, nsfw=False)
+    print(response.json())
+    assert response.status_code == 200
+
+    assert response.json()["pagination"]["total"] == 1
+    assert_composition(response.json()["items"][0], composition)
+
+    response = await requests.content.list_compositions(client, nsfw=True)
+    print(response.json())
+    assert response.status_code == 200
+
+    assert response.json()["pagination"]["total"] == 1
+    assert_composition(response.json()["items"][0], nsfw)
+
+    response = await requests.content.list_compositions(client)
+    assert response.json()["pagination"]["total"] == 2
+
+
 async def test_genres_none(client, composition):
     genres = ["non-existent"]
     response = await requests.content.list_compositions(client, genres=genres)
@@ -59,6 +100,7 @@ async def test_genres_none(client, composition):
         "total": 0,
         "pages": 0,
         "page": 1,
+        "exact": True,
     }
 
     assert response.json()["items"] == []
@@ -76,6 +118,7 @@ async def test_tags(client, composition, session):
         "total": 1,
         "pages": 1,
         "page": 1,
+        "exact": True,
     }
 
     assert_composition(response.json()["items"][0], composition)
@@ -91,6 +134,7 @@ async def test_tags_none(client, composition):
         "total": 0,
         "pages": 0,
         "page": 1,
+        "exact": True,
     }
 
     assert response.json()["items"] == []
@@ -107,6 +151,7 @@ async def test_years(client, composition):
         "total": 1,
         "pages": 1,
         "page": 1,
+        "exact": True,
     }
 
     assert_composition(response.json()["items"][0], composition)
@@ -123,6 +168,7 @@ async def test_years_none(client, composition):
         "total": 0,
         "pages": 0,
         "page": 1,
+        "exact": True,
     }
 
     assert response.json()["items"] == []
@@ -139,6 +185,7 @@ async def test_styles(client, composition):
         "total": 1,
         "pages": 1,
         "page": 1,
+        "exact": True,
     }
 
     assert_composition(response.json()["items"][0], composition)
@@ -155,6 +202,7 @@ async def test_styles_none(client, composition):
         "total": 0,
         "pages": 0,
         "page": 1,
+        "exact": True,
     }
     assert response.json()["items"] == []
 
@@ -173,6 +221,7 @@ async def test_volumes(client, composition, session):
         "total": 1,
         "pages": 1,
         "page": 1,
+        "exact": True,
     }
 
     assert_composition(response.json()["items"][0], composition)
@@ -189,6 +238,7 @@ async def test_volumes_none(client, composition):
         "total": 0,
         "pages": 0,
         "page": 1,
+        "exact": True,
     }
 
     assert response.json()["items"] == []
@@ -208,6 +258,7 @@ async def test_chapters(client, composition, session):
         "total": 1,
         "pages": 1,
         "page": 1,
+        "exact": True,
     }
 
     assert_composition(response.json()["items"][0], composition)
@@ -224,6 +275,146 @@ async def test_chapters_none(client, composition):
         "total": 0,
         "pages": 0,
         "page": 1,
+        "exact": True,
     }
 
     assert response.json()["items"] == []
+
+
+async def test_genres_exclude(client, composition, genre, session):
+    composition.genres.append(genre)
+    await session.commit()
+
+    response = await requests.content.list_compositions(client, genres_exclude=[genre.slug])
+    print(response.json())
+    assert response.status_code == 200
+
+    assert response.json()["items"] == []
+
+    response = await requests.content.list_compositions(client, genres_exclude=["non-existent"])
+    print(response.json())
+    assert response.status_code == 200
+
+    assert_composition(response.json()["items"][0], composition)
+
+
+async def test_tags_exclude(client, composition, session):
+    composition.tags.extend(["tag", "other"])
+    await session.commit()
+
+    response = await requests.content.list_compositions(client, tags_exclude=["tag"])
+    print(response.json())
+    assert response.status_code == 200
+
+    assert response.json()["items"] == []
+
+    response = await requests.content.list_compositions(client, tags_exclude=["non-existent"])
+    print(response.json())
+    assert response.status_code == 200
+
+    assert_composition(response.json()["items"][0], composition)
+
+
+async def test_sort(client, session):
+    first = await helpers.create_composition(session, "B", year=2001)
+    second = await helpers.create_composition(session, "Z", title_uk="C", year=None)
+    third = await helpers.create_composition(session, "Y", title_en="A", year=2000)
+
+    for sort, order, expected in (
+        (None, "asc", [first, second, third]),
+        ("title", "asc", [third, first, second]),
+        ("year", "desc", [first, third, second]),
+        ("created_at", "desc", [third, second, first]),
+    ):
+        response = await requests.content.list_compositions(client, sort=sort, order=order)
+        print(response.json())
+        assert response.status_code == 200
+
+        assert [item["id"] for item in response.json()["items"]] == [
+            composition.id for composition in expected
+        ]
+
+
+async def test_sort_cursor(client, session):
+    for index in range(constants.DEFAULT_PAGE_SIZE + 1):
+        await helpers.create_composition(session, f"Composition {index:02}")
+
+    response = await requests.content.list_compositions(client, sort="title", cursor="")
+    print(response.json())
+    assert response.status_code == 200
+
+    titles = [item["title"] for item in response.json()["items"]]
+
+    response = await requests.content.list_compositions(
+        client, sort="title", cursor=response.json()["next"]
+    )
+    print(response.json())
+    assert response.status_code == 200
+
+    assert response.json()["next"] is None
+    titles += [item["title"] for item in response.json()["items"]]
+
+    assert titles == [f"Composition {index:02}" for index in range(constants.DEFAULT_PAGE_SIZE + 1)]
+
+
+async def test_count_estimate(client, composition, monkeypatch):
+    response = await requests.content.list_compositions(client, count="estimate")
+    print(response.json())
+    assert response.status_code == 200
+
+    # Small result is counted exactly
+    assert response.json()["pagination"] == {"total": 1, "pages": 1, "page": 1, "exact": True}
+
+    monkeypatch.setattr(constants, "COUNT_ESTIMATE_THRESHOLD", 0)
+
+    response = await requests.content.list_compositions(client, count="estimate", years=(0, 3000))
+    print(response.json())
+    assert response.status_code == 200
+
+    assert response.json()["pagination"]["exact"] is False
+    assert_composition(response.json()["items"][0], composition)
+
+
+async def test_count_cached(client, session, composition):
+    response = await requests.content.list_compositions(client)
+    assert response.json()["pagination"]["total"] == 1
+
+    await helpers.create_composition(session, title_original="Other composition")
+
+    # Count is served from cache, while items are not
+    response = await requests.content.list_compositions(client)
+    assert response.json()["pagination"]["total"] == 1
+    assert len(response.json()["items"]) == 2
+
+    # Filters are part of the key
+    response = await requests.content.list_compositions(client, tags=["missing"])
+    assert response.json()["pagination"]["total"] == 0
+
+    await result_cache.invalidate(["composition:*"])
+
+    response = await requests.content.list_compositions(client)
+    assert response.json()["pagination"]["total"] == 2
+
+
+async def test_count_invalidated_by_tags(client, session, genre):
+    comedy = await helpers.create_genre(session, "Comedy", "Комедія", "comedy")
+
+    for slug in (genre.slug, comedy.slug):
+        response = await requests.content.list_compositions(client, genres=[slug])
+        assert response.json()["pagination"]["total"] == 0
+
+    composition = await helpers.create_composition(session)
+    composition.genres.append(genre)
+    await session.commit()
+
+    await result_cache.invalidate(service.composition_cache_tags(composition))
+
+    response = await requests.content.list_compositions(client, genres=[genre.slug])
+    assert response.json()["pagination"]["total"] == 1
+
+    # Count of unrelated genre stays cached
+    composition.genres.append(comedy)
+    await session.commit()
+
+    response = await requests.content.list_compositions(client, genres=[comedy.slug])
+    assert response.json()["pagination"]["total"] == 0
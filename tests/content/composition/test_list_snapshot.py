@@ -0,0 +1,104 @@
+import pytest
+from sqlalchemy import update
+
+from src import constants
+from src.models import Composition
+from tests import requests, helpers
+from src.catalog_snapshot import catalog_snapshot
+
+pytest.importorskip("numpy")
+
+
+@pytest.fixture
+async def catalog(session, genre, catalog_snapshot_enabled):
+    drama = await helpers.create_composition(session, "Drama", year=2000, chapters=10)
+    await helpers.create_composition(
+        session,
+        "Manhwa",
+        year=2005,
+        chapters=None,
+        nsfw=True,
+        style=constants.STYLE_COMPOSITION_MANHWA,
+    )
+    await helpers.create_composition(session, "No year", year=None)
+
+    drama.genres.append(genre)
+    await session.commit()
+
+    await catalog_snapshot.refresh(session)
+
+
+async def list_titles(client, **filters):
+    response = await requests.content.list_compositions(client, **filters)
+    print(response.json())
+    assert response.status_code == 200
+
+    return response.json()["pagination"]["total"], [
+        item["title_original"] for item in response.json()["items"]
+    ]
+
+
+async def test_empty_filters(client, catalog):
+    assert await list_titles(client) == (3, ["Drama", "Manhwa", "No year"])
+
+
+async def test_genres(client, catalog, genre):
+    assert await list_titles(client, genres=[genre.slug]) == (1, ["Drama"])
+    assert await list_titles(client, genres=["non-existent"]) == (0, [])
+    assert await list_titles(client, genres_exclude=[genre.slug]) == (2, ["Manhwa", "No year"])
+
+
+async def test_ranges(client, catalog):
+    assert await list_titles(client, years=(1999, 2001)) == (1, ["Drama"])
+    assert await list_titles(client, chapters=(0, 100)) == (1, ["Drama"])
+
+
+async def test_styles(client, catalog):
+    styles = [constants.STYLE_COMPOSITION_MANHWA]
+    assert await list_titles(client, styles=styles) == (1, ["Manhwa"])
+
+
+async def test_refresh(client, session, catalog):
+    await helpers.create_composition(session, "Late", year=2000)
+    await catalog_snapshot.refresh(session)
+
+    assert await list_titles(client, years=(2000, 2000)) == (2, ["Drama", "Late"])
+
+
+async def test_nsfw(client, catalog):
+    assert await list_titles(client, nsfw=True) == (1, ["Manhwa"])
+    assert await list_titles(client, nsfw=False) == (2, ["Drama", "No year"])
+
+
+async def test_genres_duplicated_slug(client, session, catalog, genre):
+    duplicate = await helpers.create_genre(session, "Drama", "Драма", genre.slug)
+    composition = await helpers.create_composition(session, "Duplicate")
+    composition.genres.append(duplicate)
+    await session.commit()
+
+    await catalog_snapshot.refresh(session)
+
+    assert await list_titles(client, genres=[genre.slug]) == (2, ["Drama", "Duplicate"])
+
+
+async def test_refresh_modified(client, session, catalog):
+    composition = await helpers.create_composition(session, "Modified", year=1990)
+    await catalog_snapshot.refresh(session)
+
+    composition.year = 2000
+    await session.commit()
+    await catalog_snapshot.refresh(session)
+
+    assert await list_titles(client, years=(2000, 2000)) == (2, ["Drama", "Modified"])
+    assert await list_titles(client, years=(1990, 1990)) == (0, [])
+
+
+async def test_refresh_late_commit(client, session, catalog):
+    # Composition with lower id committed after higher ones were added to snapshot
+    late = await helpers.create_composition(session, "Late", year=2000)
+    await session.execute(update(Composition).filter_by(id=late.id).values(id=-late.id))
+    await session.commit()
+
+    await catalog_snapshot.refresh(session)
+
+    assert await list_titles(client, years=(2000, 2000)) == (2, ["Late", "Drama"])
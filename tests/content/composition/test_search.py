@@ -0,0 +1,68 @@
+from src import constants
+from tests import requests, helpers
+from tests.helpers import assert_composition
+
+
+async def test_none(client, composition):
+    response = await requests.content.search_compositions(client, "nothing")
+    print(response.json())
+    assert response.status_code == 200
+
+    assert response.json() == {"items": [], "next": None}
+
+
+async def test_normal(client, composition):
+    response = await requests.content.search_compositions(client, "trigger")
+    print(response.json())
+    assert response.status_code == 200
+
+    assert response.json()["next"] is None
+    assert_composition(response.json()["items"][0], composition)
+
+
+async def test_ranking(client, session):
+    in_synopsis = await helpers.create_composition(
+        session, "Another", synopsis_en="Story about a trigger"
+    )
+    in_title = await helpers.create_composition(session, "Trigger")
+
+    response = await requests.content.search_compositions(client, "trigger")
+    print(response.json())
+    assert response.status_code == 200
+
+    assert [item["id"] for item in response.json()["items"]] == [in_title.id, in_synopsis.id]
+
+
+async def test_filters(client, session):
+    await helpers.create_composition(session, "Trigger")
+    manhwa = await helpers.create_composition(
+        session, "Trigger | Manhwa", style=constants.STYLE_COMPOSITION_MANHWA
+    )
+
+    response = await requests.content.search_compositions(
+        client, "trigger", styles=[constants.STYLE_COMPOSITION_MANHWA]
+    )
+    print(response.json())
+    assert response.status_code == 200
+
+    assert [item["id"] for item in response.json()["items"]] == [manhwa.id]
+
+
+async def test_cursor(client, session):
+    for index in range(constants.DEFAULT_PAGE_SIZE + 1):
+        await helpers.create_composition(session, f"Trigger {index}")
+
+    response = await requests.content.search_compositions(client, "trigger")
+    print(response.json())
+    assert response.status_code == 200
+
+    first = response.json()
+    assert len(first["items"]) == constants.DEFAULT_PAGE_SIZE
+
+    response = await requests.content.search_compositions(client, "trigger", first["next"])
+    print(response.json())
+    assert response.status_code == 200
+
+    assert response.json()["next"] is None
+    assert len(response.json()["items"]) == 1
+    assert response.json()["items"][0]["id"] not in {item["id"] for item in first["items"]}
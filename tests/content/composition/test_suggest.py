@@ -0,0 +1,71 @@
+from sqlalchemy import update
+
+from src.models import Composition
+from tests import requests, helpers
+from src.suggest import suggest_index
+
+
+async def test_none(client, composition, session):
+    await suggest_index.refresh(session)
+
+    response = await requests.content.suggest_compositions(client, "nothing")
+    print(response.json())
+    assert response.status_code == 200
+
+    assert response.json() == []
+
+
+async def test_normal(client, composition, session):
+    await suggest_index.refresh(session)
+
+    for query in ("wor", "TRIG", "season 3", composition.slug[:10]):
+        response = await requests.content.suggest_compositions(client, query)
+        print(response.json())
+        assert response.status_code == 200
+
+        assert response.json() == [{"slug": composition.slug, "title": composition.title}]
+
+
+async def test_limit(client, session):
+    for index in range(3):
+        await helpers.create_composition(session, f"Trigger {index}")
+
+    await suggest_index.refresh(session)
+
+    response = await requests.content.suggest_compositions(client, "trigger", limit=2)
+    print(response.json())
+    assert response.status_code == 200
+
+    assert len(response.json()) == 2
+
+
+async def test_refresh(client, session):
+    await helpers.create_composition(session, "First")
+    await suggest_index.refresh(session)
+
+    await helpers.create_composition(session, "Second")
+    await suggest_index.refresh(session)
+
+    response = await requests.content.suggest_compositions(client, "second")
+    print(response.json())
+    assert response.status_code == 200
+
+    assert [item["title"] for item in response.json()] == ["Second"]
+
+
+async def test_refresh_late_commit(client, session):
+    first = await helpers.create_composition(session, "First")
+    await suggest_index.refresh(session)
+
+    # Composition with lower id committed after higher one was indexed
+    late = await helpers.create_composition(session, "Late")
+    await session.execute(update(Composition).filter_by(id=late.id).values(id=first.id - 1))
+    await session.commit()
+
+    await suggest_index.refresh(session)
+
+    response = await requests.content.suggest_compositions(client, "late")
+    print(response.json())
+    assert response.status_code == 200
+
+    assert [item["title"] for item in response.json()] == ["Late"]
@@ -26,3 +26,25 @@ async def test_normal(client, composition_variant):
         volumes=composition_variant.volumes,
         chapters=composition_variant.chapters,
     )
+
+
+async def test_not_modified_stale_genre(client, session, token_admin, composition_variant, genre):
+    composition_variant.origin.genres.append(genre)
+    await session.commit()
+
+    path = f"/content/composition/variant/{composition_variant.id}"
+
+    # Token skips response cache, so route validates the request
+    response = await client.get(path, headers={"Token": token_admin.body})
+    etag = response.headers["etag"]
+
+    response = await client.get(path, headers={"Token": token_admin.body, "If-None-Match": etag})
+    assert response.status_code == 304
+
+    # Variant embeds genres of its origin, updated genre marks origin as updated
+    genre.name_en = "Comedy"
+    await session.commit()
+
+    response = await client.get(path, headers={"Token": token_admin.body, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
@@ -7,7 +7,7 @@ async def test_composition_none(client):
     print(response.json())
     assert response.status_code == 200
 
-    assert response.json()["pagination"] == {"total": 0, "pages": 0, "page": 1}
+    assert response.json()["pagination"] == {"total": 0, "pages": 0, "page": 1, "exact": True}
 
     assert response.json()["items"] == []
 
@@ -17,7 +17,7 @@ async def test_none(client, composition):
     print(response.json())
     assert response.status_code == 200
 
-    assert response.json()["pagination"] == {"total": 0, "pages": 0, "page": 1}
+    assert response.json()["pagination"] == {"total": 0, "pages": 0, "page": 1, "exact": True}
 
     assert response.json()["items"] == []
 
@@ -29,7 +29,7 @@ async def test_normal(client, composition_variant):
     print(response.json())
     assert response.status_code == 200
 
-    assert response.json()["pagination"] == {"total": 1, "pages": 1, "page": 1}
+    assert response.json()["pagination"] == {"total": 1, "pages": 1, "page": 1, "exact": True}
 
     assert_contain(
         response.json()["items"][0],
@@ -1,4 +1,7 @@
+import asyncio
+
 from src import constants
+from src.routes.content.page import service
 from tests import requests
 from tests.helpers import assert_contain
 
@@ -16,7 +19,9 @@ async def test_none(client, chapter):
     print(response.json())
     assert response.status_code == 200
 
-    assert_contain(response.json(), pagination={"total": 0, "pages": 0, "page": 1}, items=[])
+    assert_contain(
+        response.json(), pagination={"total": 0, "pages": 0, "page": 1, "exact": True}, items=[]
+    )
 
 
 async def test_normal_image(client, chapter, page_image):
@@ -24,7 +29,7 @@ async def test_normal_image(client, chapter, page_image):
     print(response.json())
     assert response.status_code == 200
 
-    assert response.json()["pagination"] == {"total": 1, "pages": 1, "page": 1}
+    assert response.json()["pagination"] == {"total": 1, "pages": 1, "page": 1, "exact": True}
 
     assert_contain(
         response.json()["items"][0],
@@ -48,10 +53,66 @@ async def test_normal_text(client, composition, chapter, page_text, session):
     print(response.json())
     assert response.status_code == 200
 
-    assert response.json()["pagination"] == {"total": 1, "pages": 1, "page": 1}
+    assert response.json()["pagination"] == {"total": 1, "pages": 1, "page": 1, "exact": True}
 
     assert_contain(
         response.json()["items"][0],
         index=page_text.index,
         text=page_text.text,
     )
+
+
+async def test_not_modified(client, token_admin, composition, chapter, page_text, session):
+    composition.style = constants.STYLE_COMPOSITION_RANOBE
+    await session.commit()
+
+    response = await requests.content.list_pages(client, chapter.id)
+    etag = response.headers["etag"]
+
+    response = await client.get(
+        f"/content/page/list/{chapter.id}",
+        headers={"Token": token_admin.body, "If-None-Match": etag},
+    )
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+    response = await requests.content.create_text_page(
+        client, token_admin.body, chapter.id, "page text" * 100, 2
+    )
+    assert response.status_code == 200
+
+    response = await client.get(
+        f"/content/page/list/{chapter.id}",
+        headers={"Token": token_admin.body, "If-None-Match": etag},
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["pagination"]["total"] == 2
+
+
+async def test_coalesced(client, chapter, page_image, monkeypatch):
+    get_chapter, pages_version = service.get_chapter, service.pages_version
+    calls = []
+
+    async def slow_get_chapter(session, chapter_id):
+        calls.append("chapter")
+        await asyncio.sleep(0.1)
+        return await get_chapter(session, chapter_id)
+
+    async def counted_pages_version(session, chapter_id):
+        calls.append("version")
+        return await pages_version(session, chapter_id)
+
+    monkeypatch.setattr(service, "get_chapter", slow_get_chapter)
+    monkeypatch.setattr(service, "pages_version", counted_pages_version)
+
+    responses = await asyncio.gather(
+        *(requests.content.list_pages(client, chapter.id) for _ in range(5))
+    )
+
+    assert calls == ["chapter", "version"]
+    assert len({response.headers["etag"] for response in responses}) == 1
+    for response in responses:
+        assert response.status_code == 200
+        assert_contain(response.json()["items"][0], index=page_image.index)
+        assert response.json()["items"][0]["image"]["url"] == page_image.image.url
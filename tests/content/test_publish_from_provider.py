@@ -37,3 +37,11 @@ async def test_normal_composition(client):
         )
     print(response.json())
     assert response.status_code == 200
+
+    slug = response.json()["slug"]
+
+    response = await requests.content.suggest_compositions(client, slug)
+    print(response.json())
+    assert response.status_code == 200
+
+    assert [item["slug"] for item in response.json()] == [slug]
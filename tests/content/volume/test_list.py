@@ -15,7 +15,9 @@ async def test_none(client, composition_variant):
     print(response.json())
     assert response.status_code == 200
 
-    assert_contain(response.json(), pagination={"total": 0, "pages": 0, "page": 1}, items=[])
+    assert_contain(
+        response.json(), pagination={"total": 0, "pages": 0, "page": 1, "exact": True}, items=[]
+    )
 
 
 async def test_normal(client, composition_variant, volume):
@@ -23,7 +25,7 @@ async def test_normal(client, composition_variant, volume):
     print(response.json())
     assert response.status_code == 200
 
-    assert response.json()["pagination"] == {"total": 1, "pages": 1, "page": 1}
+    assert response.json()["pagination"] == {"total": 1, "pages": 1, "page": 1, "exact": True}
 
     assert_contain(
         response.json()["items"][0],
@@ -36,6 +36,16 @@ async def token_info(
     )
 
 
+async def revoke_tokens(
+    client: TestClient,
+    token: str,
+) -> Response:
+    return await client.post(
+        "/auth/token/revoke",
+        headers={"Token": token},
+    )
+
+
 async def list_oauth_providers(client: TestClient) -> Response:
     return await client.get(
         "/auth/oauth/providers",
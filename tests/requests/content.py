@@ -36,10 +36,18 @@ async def list_compositions(
     volumes: tuple[int, int] | None = None,
     chapters: tuple[int, int] | None = None,
     genres_exclude: list[str] | None = None,
+    nsfw: bool | None = None,
+    sort: str | None = None,
+    order: str = "asc",
+    cursor: str | None = None,
+    count: str = "exact",
 ) -> Response:
     return await client.post(
         "/content/composition/list",
+        query_string={"count": count} if cursor is None else {"cursor": cursor},
         json={
+            "sort": sort,
+            "order": order,
             "tags": tags,
             "years": years,
             "styles": styles,
@@ -48,10 +56,43 @@ async def list_compositions(
             "chapters": chapters,
             "tags_exclude": tags_exclude,
             "genres_exclude": genres_exclude,
+            "nsfw": nsfw,
         },
     )
 
 
+async def composition_facets(
+    client: TestClient,
+    tags: list[str] | None = None,
+    genres: list[str] | None = None,
+    styles: list[str] | None = None,
+    years: tuple[int, int] | None = None,
+) -> Response:
+    return await client.post(
+        "/content/composition/facets",
+        json={
+            "tags": tags,
+            "years": years,
+            "styles": styles,
+            "genres": genres,
+        },
+    )
+
+
+async def suggest_compositions(
+    client: TestClient, query: str, limit: int | None = None
+) -> Response:
+    query_string = {"query": query}
+    if limit is not None:
+        query_string["limit"] = limit
+
+    return await client.get("/content/composition/suggest", query_string=query_string)
+
+
+async def get_compositions_batch(client: TestClient, keys: list[int | str]) -> Response:
+    return await client.post("/content/composition/batch", json={"keys": keys})
+
+
 async def publish_composition_variant(
     client: TestClient,
     token: str,
@@ -93,10 +134,13 @@ async def create_volume(
     )
 
 
-async def list_volumes(client: TestClient, variant_id: int, page: int = 1) -> Response:
+async def list_volumes(
+    client: TestClient, variant_id: int, page: int = 1, cursor: str | None = None
+) -> Response:
+    query = {"page": page} if cursor is None else {"cursor": cursor}
     return await client.get(
         f"/content/volume/list/{variant_id}",
-        query_string={"page": page},
+        query_string=query,
     )
 
 
@@ -118,10 +162,13 @@ async def create_chapter(
     )
 
 
-async def list_chapters(client: TestClient, volume_id: int, page: int = 1) -> Response:
+async def list_chapters(
+    client: TestClient, volume_id: int, page: int = 1, cursor: str | None = None
+) -> Response:
+    query = {"page": page} if cursor is None else {"cursor": cursor}
     return await client.get(
         f"/content/chapter/list/{volume_id}",
-        query_string={"page": page},
+        query_string=query,
     )
 
 
@@ -163,3 +210,16 @@ async def list_pages(client: TestClient, chapter_id: int, page: int = 1) -> Resp
 
 async def get_page(client: TestClient, page_id: int) -> Response:
     return await client.get(f"/content/page/{page_id}")
+
+
+async def search_compositions(
+    client: TestClient,
+    query: str,
+    cursor: str = "",
+    styles: list[str] | None = None,
+) -> Response:
+    return await client.post(
+        "/content/composition/search",
+        json={"query": query, "styles": styles},
+        query_string={"cursor": cursor},
+    )
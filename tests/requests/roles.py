@@ -34,8 +34,8 @@ async def create_role(
     )
 
 
-async def list_roles(client: TestClient) -> Response:
-    return await client.get("/roles")
+async def list_roles(client: TestClient, cursor: str | None = None) -> Response:
+    return await client.get("/roles", query_string={} if cursor is None else {"cursor": cursor})
 
 
 async def update_role(
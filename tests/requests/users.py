@@ -6,6 +6,8 @@ __all__ = [
     "me",
     "user",
     "update_own_info",
+    "count_online",
+    "list_online",
 ]
 
 
@@ -71,3 +73,11 @@ async def update_others_info(
             "remove_description": remove_description,
         },
     )
+
+
+async def count_online(client: TestClient) -> Response:
+    return await client.get("/users/online/count")
+
+
+async def list_online(client: TestClient, page: int = 1) -> Response:
+    return await client.get("/users/online/list", query_string={"page": page})
@@ -7,7 +7,7 @@ async def test_normal(client, role_unverified):
     print(response.json())
     assert response.status_code == 200
 
-    assert response.json()["pagination"] == {"total": 1, "page": 1, "pages": 1}
+    assert response.json()["pagination"] == {"total": 1, "page": 1, "pages": 1, "exact": True}
 
     role = response.json()["items"][0]
     assert_contain(
@@ -24,4 +24,16 @@ async def test_no_roles(client):
     response = await requests.roles.list_roles(client)
     print(response.json())
     assert response.status_code == 200
-    assert response.json()["pagination"] == {"total": 0, "page": 1, "pages": 0}
+    assert response.json()["pagination"] == {"total": 0, "page": 1, "pages": 0, "exact": True}
+
+
+async def test_cursor(client, role_unverified, role_user):
+    response = await requests.roles.list_roles(client, cursor="")
+    print(response.json())
+    assert response.status_code == 200
+
+    assert_contain(response.json(), next=None)
+    assert [role["name"] for role in response.json()["items"]] == [
+        role_user.name,
+        role_unverified.name,
+    ]
@@ -46,3 +46,26 @@ async def test_permissions_merge(client, role_user, master_key):
     assert response.json()["permissions"] == permissions_to_json(
         merge_permissions(role_user.permissions, new_permissions)
     )
+
+
+async def test_permissions_applied(client, role_user, user_regular, token_regular, master_key):
+    response = await requests.users.me(client, token_regular.body)
+    print(response.json())
+    assert response.status_code == 200
+
+    new_permissions = {permissions.user.update_info: True}
+    response = await requests.roles.update_role(
+        client,
+        master_key,
+        role_user.name,
+        permissions=new_permissions,
+    )
+    print(response.json())
+    assert response.status_code == 200
+
+    response = await requests.users.me(client, token_regular.body)
+    print(response.json())
+    assert response.status_code == 200
+    assert response.json()["permissions"] == permissions_to_json(
+        merge_permissions(new_permissions, user_regular.local_permissions)
+    )
@@ -1,6 +1,11 @@
+import asyncio
+import contextlib
+
 from async_asgi_testclient import TestClient
 
 from tests import requests
+from src.database import session_holder
+from src.token_usage import token_usage
 from src.util import utc_timestamp
 from src.permissions import permissions
 from tests.helpers import permissions_to_json
@@ -37,3 +42,67 @@ async def test_invalid_token(client: TestClient):
 
     assert response.json().get("code") == "required"
     assert response.json().get("category") == "token"
+
+
+async def test_cached_token_invalidated(client: TestClient, user_regular, token_regular):
+    response = await requests.users.me(client, token_regular.body)
+    print(response.json())
+    assert response.status_code == 200
+
+    new_pseudonym = "pseudonym"
+    response = await requests.users.update_own_info(
+        client, token_regular.body, pseudonym=new_pseudonym
+    )
+    print(response.json())
+    assert response.status_code == 200
+
+    response = await requests.users.me(client, token_regular.body)
+    print(response.json())
+    assert response.status_code == 200
+
+    assert response.json()["pseudonym"] == new_pseudonym
+
+
+async def test_token_usage_recorded(client: TestClient, session, user_regular, token_regular):
+    assert token_regular.used_at is None
+
+    response = await requests.users.me(client, token_regular.body)
+    print(response.json())
+    assert response.status_code == 200
+
+    await session.refresh(token_regular)
+    assert token_regular.used_at is not None
+
+
+async def test_token_usage_stop_during_flush(session, token_regular, monkeypatch):
+    flushing = asyncio.Event()
+    open_session = session_holder.session
+
+    @contextlib.asynccontextmanager
+    async def slow_session():
+        async with open_session() as session_:
+            execute = session_.execute
+
+            async def slow_execute(*args, **kwargs):
+                flushing.set()
+                await asyncio.sleep(0.1)
+                return await execute(*args, **kwargs)
+
+            session_.execute = slow_execute
+            yield session_
+
+    monkeypatch.setattr(session_holder, "session", slow_session)
+
+    token_usage.setup(0.01)
+    try:
+        token_usage.start()
+        await token_usage.record(token_regular, prolong=False)
+
+        # Batch in progress is written, not lost
+        await flushing.wait()
+        await token_usage.stop()
+    finally:
+        token_usage.setup(None)
+
+    await session.refresh(token_regular)
+    assert token_regular.used_at is not None
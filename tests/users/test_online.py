@@ -0,0 +1,31 @@
+from async_asgi_testclient import TestClient
+
+from tests import requests
+
+
+async def test_count_empty(client: TestClient):
+    response = await requests.users.count_online(client)
+    print(response.json())
+    assert response.status_code == 200
+
+    assert response.json() == {"count": 0}
+
+
+async def test_normal(client: TestClient, user_regular, token_regular):
+    response = await requests.users.me(client, token_regular.body)
+    print(response.json())
+    assert response.status_code == 200
+
+    response = await requests.users.count_online(client)
+    print(response.json())
+    assert response.status_code == 200
+
+    assert response.json() == {"count": 1}
+
+    response = await requests.users.list_online(client)
+    print(response.json())
+    assert response.status_code == 200
+
+    assert response.json()["pagination"] == {"total": 1, "pages": 1, "page": 1, "exact": True}
+    assert [user["id"] for user in response.json()["items"]] == [user_regular.id]
+    assert response.json()["items"][0]["online"] is True